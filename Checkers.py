@@ -1,12 +1,17 @@
 import pygame
-import copy
+import os
 import sys
 import time
 import math
 
+from engine import checkers
+from engine.background import BackgroundSearch
+from engine.stats import from_environment
+from engine.tablebase import Tablebase
+
 # Constantes
 WIDTH, HEIGHT = 500, 500
-ROWS, COLS = 6, 6
+ROWS, COLS = checkers.ROWS, checkers.COLS
 SQUARE_SIZE = WIDTH // COLS
 
 WHITE = (255, 255, 255)
@@ -19,11 +24,20 @@ HIGHLIGHT = (255, 255, 0)
 CROWN_COLOR = (255, 215, 0)
 GOLD = (212, 175, 55)
 
-pygame.init()
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Damas com IA - Minimax + AlfaBeta")
-FONT = pygame.font.SysFont('Arial', 32)
-SMALL_FONT = pygame.font.SysFont('Arial', 24)
+# Cor de desenho de cada lado do motor, e o inverso
+PIECE_COLORS = {checkers.WHITE: WHITE, checkers.BLACK: BLACK}
+SIDES = {WHITE: checkers.WHITE, BLACK: checkers.BLACK}
+
+# Tempo de busca da IA por jogada
+AI_TIME_BUDGET_MS = 1500
+
+# Tabela de finais, usada se existir (python -m engine.tablebase checkers_tablebase.bin)
+TABLEBASE_PATH = "checkers_tablebase.bin"
+
+# Criados em main(), para que importar o módulo não abra uma janela
+WIN = None
+FONT = None
+SMALL_FONT = None
 
 class Piece:
     PADDING = 10
@@ -94,10 +108,11 @@ class Piece:
         return self.animating
 
 class Board:
+    # Estado do jogo em checkers.Position; as peças (Piece) existem apenas para
+    # desenhar e animar, e são construídas a partir da posição
     def __init__(self):
+        self.position = checkers.Position()
         self.board = []
-        self.white_left = self.black_left = 6
-        self.white_kings = self.black_kings = 0
         self.create_board()
 
     def draw_squares(self, win):
@@ -107,32 +122,7 @@ class Board:
                 pygame.draw.rect(win, WHITE, (col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
 
     def evaluate(self):
-        white_score = 0
-        black_score = 0
-
-        for row in range(ROWS):
-            for col in range(COLS):
-                piece = self.board[row][col]
-                if piece != 0:
-                    value = 1.5 if piece.king else 1
-
-                    center_bonus = 0.3 if 2 <= row <= 5 and 2 <= col <= 5 else 0
-
-                    progress_bonus = (row / 7) * 0.2 if piece.color == WHITE else ((7 - row) / 7) * 0.2
-
-                    total = value + center_bonus + progress_bonus
-
-                    if piece.color == WHITE:
-                        white_score += total
-                    else:
-                        black_score += total
-
-        
-        white_moves = len(self.get_all_valid_moves(WHITE))
-        black_moves = len(self.get_all_valid_moves(BLACK))
-        mobility_score = (white_moves - black_moves) * 0.1
-
-        return white_score - black_score + mobility_score
+        return self.position.evaluate()
 
     def get_all_pieces(self, color):
         pieces = []
@@ -143,16 +133,15 @@ class Board:
         return pieces
 
     def create_board(self):
+        self.board = []
         for row in range(ROWS):
             self.board.append([])
             for col in range(COLS):
-                if row % 2 == (col + 1) % 2:
-                    if row < 2:
-                        self.board[row].append(Piece(row, col, BLACK))
-                    elif row > 3:
-                        self.board[row].append(Piece(row, col, WHITE))
-                    else:
-                        self.board[row].append(0)
+                code = self.position.get_piece(row, col)
+                if code != checkers.EMPTY:
+                    piece = Piece(row, col, PIECE_COLORS[checkers.color_of(code)])
+                    piece.king = abs(code) == checkers.KING
+                    self.board[row].append(piece)
                 else:
                     self.board[row].append(0)
 
@@ -164,260 +153,42 @@ class Board:
                     piece.draw(win)
 
     def move(self, piece, row, col):
+        promoted = self.position.move(checkers.square(piece.row, piece.col), checkers.square(row, col))
         self.board[piece.row][piece.col], self.board[row][col] = 0, piece
         piece.move(row, col)
-        if (piece.color == WHITE and row == 0) or (piece.color == BLACK and row == ROWS - 1):
-            if not piece.king:  # Só faz dama se ainda não for
-                piece.make_king()
-                if piece.color == WHITE:
-                    self.white_kings += 1
-                else:
-                    self.black_kings += 1
+        if promoted:
+            piece.make_king()
 
     def get_piece(self, row, col):
         return self.board[row][col]
 
     def remove(self, pieces):
+        self.position.remove([checkers.square(piece.row, piece.col) for piece in pieces if piece != 0])
         for piece in pieces:
             self.board[piece.row][piece.col] = 0
-            if piece != 0:
-                if piece.color == BLACK:
-                    self.black_left -= 1
-                    if piece.king:
-                        self.black_kings -= 1
-                else:
-                    self.white_left -= 1
-                    if piece.king:
-                        self.white_kings -= 1
 
     def winner(self):
-        if self.black_left <= 0:
-            return WHITE
-        elif self.white_left <= 0:
-            return BLACK
-        
-        white_moves = len(self.get_all_valid_moves(WHITE))
-        black_moves = len(self.get_all_valid_moves(BLACK))
-        
-        if white_moves == 0:
-            return BLACK
-        if black_moves == 0:
-            return WHITE
-        
-        return None
+        winner = self.position.winner()
+        return PIECE_COLORS[winner] if winner is not None else None
 
-    def get_valid_moves(self, piece):
-        moves = {}
-        
-        if piece.king:
-            # Movimento para damas - pode se mover em qualquer diagonal
-            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]  # Todas as direções diagonais
-            for dr, dc in directions:
-                for i in range(1, ROWS):
-                    r, c = piece.row + dr * i, piece.col + dc * i
-                    if 0 <= r < ROWS and 0 <= c < COLS:
-                        if self.board[r][c] == 0:
-                            moves[(r, c)] = []
-                        else:
-                            if self.board[r][c].color != piece.color:
-                                r2, c2 = r + dr, c + dc
-                                if 0 <= r2 < ROWS and 0 <= c2 < COLS and self.board[r2][c2] == 0:
-                                    moves[(r2, c2)] = [self.board[r][c]]
-                            break
-                    else:
-                        break
-        else:
-            # Movimento para peças normais
-            left = piece.col - 1
-            right = piece.col + 1
-            row = piece.row
-
-            if piece.color == WHITE:
-                moves.update(self._traverse_left(row - 1, max(row - 3, -1), -1, piece.color, left))
-                moves.update(self._traverse_right(row - 1, max(row - 3, -1), -1, piece.color, right))
-            else:
-                moves.update(self._traverse_left(row + 1, min(row + 3, ROWS), 1, piece.color, left))
-                moves.update(self._traverse_right(row + 1, min(row + 3, ROWS), 1, piece.color, right))
+    def _to_pieces(self, moves):
+        # {casa: [casas capturadas]} -> {(linha, coluna): [peças capturadas]}
+        return {
+            divmod(move, COLS): [self.get_piece(*divmod(sq, COLS)) for sq in skipped]
+            for move, skipped in moves.items()
+        }
 
-        # Verifica se há capturas obrigatórias
-        must_capture = any(skipped for skipped in moves.values() if skipped)
-        
-        if must_capture:
-            # Filtra apenas os movimentos de captura
-            moves = {move: skipped for move, skipped in moves.items() if skipped}
-            
-            # Agora vamos verificar se há capturas múltiplas
-            final_moves = {}
-            for move, skipped in moves.items():
-                # Simula o movimento para ver se há mais capturas disponíveis
-                temp_board = copy.deepcopy(self)
-                temp_piece = temp_board.get_piece(piece.row, piece.col)
-                temp_board.move(temp_piece, move[0], move[1])
-                temp_board.remove(skipped)
-                
-                # Verifica se há mais capturas disponíveis após este movimento
-                new_moves = temp_board.get_valid_moves(temp_board.get_piece(move[0], move[1]))
-                has_more_captures = any(skipped for skipped in new_moves.values() if skipped)
-                
-                if not has_more_captures:
-                    final_moves[move] = skipped
-                else:
-                    # Se houver mais capturas, não adiciona este movimento
-                    # Em vez disso, adiciona apenas os movimentos finais da cadeia
-                    for new_move, new_skipped in new_moves.items():
-                        if new_skipped:  # É uma captura
-                            final_moves[new_move] = skipped + new_skipped
-            
-            return final_moves if final_moves else moves
-        
-        return moves
+    def get_valid_moves(self, piece):
+        return self._to_pieces(self.position.get_valid_moves(checkers.square(piece.row, piece.col)))
 
     def get_all_valid_moves(self, color):
         all_moves = {}
-        for piece in self.get_all_pieces(color):
-            valid_moves = self.get_valid_moves(piece)
-            if valid_moves:
-                all_moves[piece] = valid_moves
+        for sq, moves in self.position.get_all_valid_moves(SIDES[color]).items():
+            all_moves[self.get_piece(*divmod(sq, COLS))] = self._to_pieces(moves)
         return all_moves
 
     def has_capture_moves(self, color):
-        for piece in self.get_all_pieces(color):
-            moves = self.get_valid_moves(piece)
-            if any(skipped for skipped in moves.values()):
-                return True
-        return False
-
-    def _traverse_left(self, start, stop, step, color, left, skipped=[]):
-        moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if left < 0:
-                break
-
-            current = self.board[r][left]
-            if current == 0:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, left)] = last + skipped
-                else:
-                    moves[(r, left)] = last
-
-                if last:
-                    row = max(r - 3, -1) if step == -1 else min(r + 3, ROWS)
-                    moves.update(self._traverse_left(r + step, row, step, color, left - 1, skipped=last))
-                    moves.update(self._traverse_right(r + step, row, step, color, left + 1, skipped=last))
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-            left -= 1
-
-        return moves
-
-    def _traverse_right(self, start, stop, step, color, right, skipped=[]):
-        moves = {}
-        last = []
-        for r in range(start, stop, step):
-            if right >= COLS:
-                break
-
-            current = self.board[r][right]
-            if current == 0:
-                if skipped and not last:
-                    break
-                elif skipped:
-                    moves[(r, right)] = last + skipped
-                else:
-                    moves[(r, right)] = last
-
-                if last:
-                    row = max(r - 3, -1) if step == -1 else min(r + 3, ROWS)
-                    moves.update(self._traverse_left(r + step, row, step, color, right - 1, skipped=last))
-                    moves.update(self._traverse_right(r + step, row, step, color, right + 1, skipped=last))
-                break
-            elif current.color == color:
-                break
-            else:
-                last = [current]
-            right += 1
-
-        return moves
-
-def minimax(position, depth, alpha, beta, max_player, game):
-    if depth == 0 or position.winner() is not None:
-        return position.evaluate(), position
-
-    if max_player:
-        max_eval = float('-inf')
-        best_move = None
-        all_moves = get_all_moves(position, WHITE, game)
-        
-        # Prioriza movimentos de captura
-        capture_moves = []
-        for move in all_moves:
-            piece, new_board = move
-            original_valid_moves = position.get_valid_moves(piece)
-            if any(skipped for skipped in original_valid_moves.values()):
-                capture_moves.append(move)
-        
-        if capture_moves:
-            all_moves = capture_moves
-            
-        for move in all_moves:
-            piece, new_board = move
-            evaluation = minimax(new_board, depth - 1, alpha, beta, False, game)[0]
-            if evaluation > max_eval:
-                max_eval = evaluation
-                best_move = new_board
-            alpha = max(alpha, evaluation)
-            if beta <= alpha:
-                break
-        return max_eval, best_move
-    else:
-        min_eval = float('inf')
-        best_move = None
-        all_moves = get_all_moves(position, BLACK, game)
-        
-        # Prioriza movimentos de captura
-        capture_moves = []
-        for move in all_moves:
-            piece, new_board = move
-            original_valid_moves = position.get_valid_moves(piece)
-            if any(skipped for skipped in original_valid_moves.values()):
-                capture_moves.append(move)
-        
-        if capture_moves:
-            all_moves = capture_moves
-            
-        for move in all_moves:
-            piece, new_board = move
-            evaluation = minimax(new_board, depth - 1, alpha, beta, True, game)[0]
-            if evaluation < min_eval:
-                min_eval = evaluation
-                best_move = new_board
-            beta = min(beta, evaluation)
-            if beta <= alpha:
-                break
-        return min_eval, best_move
-
-def simulate_move(piece, move, board, game, skip):
-    board.move(piece, move[0], move[1])
-    if skip:
-        board.remove(skip)
-    return board
-
-def get_all_moves(board, color, game):
-    moves = []
-    for piece in board.get_all_pieces(color):
-        valid_moves = board.get_valid_moves(piece)
-        for move, skip in valid_moves.items():
-            temp_board = copy.deepcopy(board)
-            temp_piece = temp_board.get_piece(piece.row, piece.col)
-            new_board = simulate_move(temp_piece, move, temp_board, game, skip)
-            moves.append((piece, new_board))
-    return moves
+        return self.position.has_capture_moves(SIDES[color])
 
 def draw_winner(win, text):
     pygame.draw.rect(win, BLACK, (WIDTH//4, HEIGHT//3, WIDTH//2, HEIGHT//3))
@@ -514,8 +285,12 @@ class Game:
             draw_game_over(self.win, f"VITÓRIA DAS {player}!")
             self.reset()
 
-    def ai_move(self, board):
-        self.board = board
+    def ai_move(self, move):
+        # Jogada do motor: (casa de origem, casa de destino, casas capturadas)
+        frm, to, skipped = move
+        self.board.move(self.board.get_piece(*divmod(frm, COLS)), *divmod(to, COLS))
+        if skipped:
+            self.board.remove([self.board.get_piece(*divmod(sq, COLS)) for sq in skipped])
         self.change_turn()
         
     def is_animating(self):
@@ -589,9 +364,25 @@ def draw_game_over(win, message):
                 waiting = False
         
 def main():
+    global WIN, FONT, SMALL_FONT
+
+    pygame.init()
+    WIN = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Damas com IA - Minimax + AlfaBeta")
+    FONT = pygame.font.SysFont('Arial', 32)
+    SMALL_FONT = pygame.font.SysFont('Arial', 24)
+
     run = True
     clock = pygame.time.Clock()
     game = Game(WIN)
+    tablebase = Tablebase(TABLEBASE_PATH) if os.path.exists(TABLEBASE_PATH) else None
+    # A IA pensa numa thread; o laço continua desenhando a 60 quadros por segundo
+    ai = BackgroundSearch()
+    stats = None
+    # Enquanto o jogador pensa, a IA busca a resposta a cada jogada dele
+    # (ponder); o resultado é aproveitado quando ele jogar
+    pondering = False
+    pondered = {}
 
     while run:
         clock.tick(60)
@@ -602,10 +393,26 @@ def main():
             continue
         
         if game.turn == BLACK and not game.waiting_for_animation:
-            _, new_board = minimax(game.board, 7, float('-inf'), float('inf'), False, game)
-            game.ai_move(new_board)
-
-        winner = game.board.winner()
+            if pondering:
+                ai.cancel()
+                pondering = False
+            if not ai.pending():
+                stats = from_environment()
+                position = game.board.position
+                ai.start(checkers.search, position.copy(), AI_TIME_BUDGET_MS, False, tablebase=tablebase,
+                         stats=stats, pondered=pondered.get(position.hash))
+            result = ai.poll()
+            if result is not None:
+                if stats is not None:
+                    stats.finish(game="checkers")
+                game.ai_move(result[0])
+                if game.turn == WHITE:
+                    pondered = {}
+                    ai.start(checkers.ponder, game.board.position.copy(), pondered, False, tablebase=tablebase)
+                    pondering = True
+
+        # O cache de jogadas é da thread da IA enquanto ela pensa ou faz ponder
+        winner = game.board.winner() if not ai.pending() else None
         if winner is not None:
             text = "Vencedor: " + ("Branco" if winner == WHITE else "Preto")
             draw_winner(WIN, text)
@@ -616,13 +423,20 @@ def main():
             if event.type == pygame.QUIT:
                 run = False
 
-            if event.type == pygame.MOUSEBUTTONDOWN and not game.is_animating():
+            # R recomeça a partida, mesmo no meio da busca da IA
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                ai.cancel()
+                pondering = False
+                game.reset()
+
+            if event.type == pygame.MOUSEBUTTONDOWN and not game.is_animating() and game.turn == WHITE:
                 pos = pygame.mouse.get_pos()
                 row, col = get_row_col_from_mouse(pos)
                 game.select(row, col)
 
         game.update()
 
+    ai.close()
     pygame.quit()
     sys.exit()
 
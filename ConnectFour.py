@@ -1,9 +1,18 @@
 import pygame
+import os
 import sys
 import numpy as np
-import math
 import random
 
+from engine.connect_four import (
+    ROW_COUNT, COLUMN_COUNT, PLAYER_PIECE, AI_PIECE,
+    create_board, drop_piece, is_valid_location, get_next_open_row, winning_move, search, ponder,
+)
+from engine.background import BackgroundSearch
+from engine.opening_book import OpeningBook
+from engine.solver import Solver
+from engine.stats import from_environment
+
 # Constantes
 BLUE = (0, 0, 255)
 BLACK = (0, 0, 0)
@@ -11,20 +20,22 @@ RED = (255, 0, 0)
 YELLOW = (255, 255, 0)
 WHITE = (255, 255, 255)
 
-ROW_COUNT = 6
-COLUMN_COUNT = 7
-
 PLAYER = 0
 AI = 1
 
-EMPTY = 0
-PLAYER_PIECE = 1
-AI_PIECE = 2
+# Tempo de busca da IA por jogada
+AI_TIME_BUDGET_MS = 1000
+# Pausa antes de mostrar a jogada da IA
+AI_MOVE_DELAY_MS = 500
 
-WINDOW_LENGTH = 4
+# A partir de quantas peças a IA tenta resolver a posição exatamente (engine.solver).
+# Com metade de AI_TIME_BUDGET_MS, o solucionador termina em cerca de 96% das
+# posições com 20 peças e em 66% com 18; abaixo disso o tempo perdido nas
+# tentativas falhas faz falta à busca heurística
+SOLVER_MIN_MOVES = 20
 
-# Inicializar pygame
-pygame.init()
+# Livro de aberturas, usado se existir (python -m engine.opening_book connect_four_book.bin)
+OPENING_BOOK_PATH = "connect_four_book.bin"
 
 # Tamanho dos quadrados
 SQUARESIZE = 100
@@ -34,161 +45,20 @@ size = (width, height)
 
 RADIUS = int(SQUARESIZE / 2 - 5)
 
-screen = pygame.display.set_mode(size)
-myfont = pygame.font.SysFont("monospace", 75)
-
-def create_board():
-    return np.zeros((ROW_COUNT, COLUMN_COUNT))
-
-def drop_piece(board, row, col, piece):
-    board[row][col] = piece
+# Criados em main(), para que importar o módulo não abra uma janela
+screen = None
+myfont = None
 
-def is_valid_location(board, col):
-    return board[ROW_COUNT - 1][col] == 0
-
-def get_next_open_row(board, col):
+def to_array(board):
+    # Conversão para matriz NumPy, usada apenas para desenhar/imprimir
+    array = np.zeros((ROW_COUNT, COLUMN_COUNT))
     for r in range(ROW_COUNT):
-        if board[r][col] == 0:
-            return r
+        for c in range(COLUMN_COUNT):
+            array[r][c] = board.get_piece(r, c)
+    return array
 
 def print_board(board):
-    print(np.flip(board, 0))
-
-def winning_move(board, piece):
-    # Verificar vitória horizontal
-    for c in range(COLUMN_COUNT - 3):
-        for r in range(ROW_COUNT):
-            if board[r][c] == piece and board[r][c+1] == piece and board[r][c+2] == piece and board[r][c+3] == piece:
-                return True
-
-    # Verificar vitória vertical
-    for c in range(COLUMN_COUNT):
-        for r in range(ROW_COUNT - 3):
-            if board[r][c] == piece and board[r+1][c] == piece and board[r+2][c] == piece and board[r+3][c] == piece:
-                return True
-
-    # Verificar vitória diagonal positiva
-    for c in range(COLUMN_COUNT - 3):
-        for r in range(ROW_COUNT - 3):
-            if board[r][c] == piece and board[r+1][c+1] == piece and board[r+2][c+2] == piece and board[r+3][c+3] == piece:
-                return True
-
-    # Verificar vitória diagonal negativa
-    for c in range(COLUMN_COUNT - 3):
-        for r in range(3, ROW_COUNT):
-            if board[r][c] == piece and board[r-1][c+1] == piece and board[r-2][c+2] == piece and board[r-3][c+3] == piece:
-                return True
-
-    return False
-
-def evaluate_window(window, piece):
-    score = 0
-    opponent_piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
-
-    if window.count(piece) == 4:
-        score += 100
-    elif window.count(piece) == 3 and window.count(EMPTY) == 1:
-        score += 5
-    elif window.count(piece) == 2 and window.count(EMPTY) == 2:
-        score += 2
-
-    if window.count(opponent_piece) == 3 and window.count(EMPTY) == 1:
-        score -= 4
-
-    return score
-
-def score_position(board, piece):
-    score = 0
-
-    # Pontuar centro
-    center_array = [int(i) for i in list(board[:, COLUMN_COUNT // 2])]
-    center_count = center_array.count(piece)
-    score += center_count * 3
-
-    # Pontuar horizontal
-    for r in range(ROW_COUNT):
-        row_array = [int(i) for i in list(board[r, :])]
-        for c in range(COLUMN_COUNT - 3):
-            window = row_array[c:c + WINDOW_LENGTH]
-            score += evaluate_window(window, piece)
-
-    # Pontuar vertical
-    for c in range(COLUMN_COUNT):
-        col_array = [int(i) for i in list(board[:, c])]
-        for r in range(ROW_COUNT - 3):
-            window = col_array[r:r + WINDOW_LENGTH]
-            score += evaluate_window(window, piece)
-
-    # Pontuar diagonal positiva
-    for r in range(ROW_COUNT - 3):
-        for c in range(COLUMN_COUNT - 3):
-            window = [board[r + i][c + i] for i in range(WINDOW_LENGTH)]
-            score += evaluate_window(window, piece)
-
-    # Pontuar diagonal negativa
-    for r in range(ROW_COUNT - 3):
-        for c in range(COLUMN_COUNT - 3):
-            window = [board[r + 3 - i][c + i] for i in range(WINDOW_LENGTH)]
-            score += evaluate_window(window, piece)
-
-    return score
-
-def is_terminal_node(board):
-    return winning_move(board, PLAYER_PIECE) or winning_move(board, AI_PIECE) or len(get_valid_locations(board)) == 0
-
-def minimax(board, depth, alpha, beta, maximizingPlayer):
-    valid_locations = get_valid_locations(board)
-    is_terminal = is_terminal_node(board)
-    
-    if depth == 0 or is_terminal:
-        if is_terminal:
-            if winning_move(board, AI_PIECE):
-                return (None, 100000000000000)
-            elif winning_move(board, PLAYER_PIECE):
-                return (None, -10000000000000)
-            else:  # Jogo terminou em empate
-                return (None, 0)
-        else:  # Profundidade é zero
-            return (None, score_position(board, AI_PIECE))
-    
-    if maximizingPlayer:
-        value = -math.inf
-        column = random.choice(valid_locations)
-        for col in valid_locations:
-            row = get_next_open_row(board, col)
-            b_copy = board.copy()
-            drop_piece(b_copy, row, col, AI_PIECE)
-            new_score = minimax(b_copy, depth-1, alpha, beta, False)[1]
-            if new_score > value:
-                value = new_score
-                column = col
-            alpha = max(alpha, value)
-            if alpha >= beta:
-                break
-        return column, value
-    
-    else:  # Minimizando jogador
-        value = math.inf
-        column = random.choice(valid_locations)
-        for col in valid_locations:
-            row = get_next_open_row(board, col)
-            b_copy = board.copy()
-            drop_piece(b_copy, row, col, PLAYER_PIECE)
-            new_score = minimax(b_copy, depth-1, alpha, beta, True)[1]
-            if new_score < value:
-                value = new_score
-                column = col
-            beta = min(beta, value)
-            if alpha >= beta:
-                break
-        return column, value
-
-def get_valid_locations(board):
-    valid_locations = []
-    for col in range(COLUMN_COUNT):
-        if is_valid_location(board, col):
-            valid_locations.append(col)
-    return valid_locations
+    print(np.flip(to_array(board), 0))
 
 def draw_board(board):
     for c in range(COLUMN_COUNT):
@@ -196,15 +66,25 @@ def draw_board(board):
             pygame.draw.rect(screen, BLUE, (c * SQUARESIZE, r * SQUARESIZE + SQUARESIZE, SQUARESIZE, SQUARESIZE))
             pygame.draw.circle(screen, BLACK, (int(c * SQUARESIZE + SQUARESIZE / 2), int(r * SQUARESIZE + SQUARESIZE + SQUARESIZE / 2)), RADIUS)
     
+    cells = to_array(board)
     for c in range(COLUMN_COUNT):
         for r in range(ROW_COUNT):        
-            if board[r][c] == PLAYER_PIECE:
+            if cells[r][c] == PLAYER_PIECE:
                 pygame.draw.circle(screen, RED, (int(c * SQUARESIZE + SQUARESIZE / 2), height - int(r * SQUARESIZE + SQUARESIZE / 2)), RADIUS)
-            elif board[r][c] == AI_PIECE: 
+            elif cells[r][c] == AI_PIECE: 
                 pygame.draw.circle(screen, YELLOW, (int(c * SQUARESIZE + SQUARESIZE / 2), height - int(r * SQUARESIZE + SQUARESIZE / 2)), RADIUS)
     pygame.display.update()
 
 def main():
+    global screen, myfont
+
+    # Inicializar pygame
+    pygame.init()
+    screen = pygame.display.set_mode(size)
+    myfont = pygame.font.SysFont("monospace", 75)
+
+    book = OpeningBook(OPENING_BOOK_PATH) if os.path.exists(OPENING_BOOK_PATH) else None
+    solver = Solver()
     board = create_board()
     print_board(board)
     game_over = False
@@ -213,9 +93,22 @@ def main():
     draw_board(board)
     pygame.display.update()
 
+    # A IA pensa numa thread; o laço continua tratando eventos a 60 quadros por segundo
+    clock = pygame.time.Clock()
+    ai = BackgroundSearch()
+    stats = None
+    # (coluna, instante em ms) da jogada da IA já calculada e ainda não mostrada
+    ai_move = None
+    # Enquanto o jogador pensa, a IA busca a resposta a cada coluna dele
+    # (ponder); o resultado é aproveitado quando ele jogar
+    pondering = False
+    pondered = {}
+
     while not game_over:
+        clock.tick(60)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                ai.close()
                 sys.exit()
 
             if event.type == pygame.MOUSEMOTION:
@@ -249,11 +142,24 @@ def main():
                         draw_board(board)
 
         # Vez da IA
-        if turn == AI and not game_over:            
-            col, minimax_score = minimax(board, 5, -math.inf, math.inf, True)
-
+        if turn == AI and not game_over:
+            if pondering:
+                ai.cancel()
+                pondering = False
+            if not ai.pending() and ai_move is None:
+                stats = from_environment()
+                ai.start(search, board.copy(), AI_TIME_BUDGET_MS, book=book, stats=stats,
+                         pondered=pondered.get(board.hash), solver=solver if board.moves >= SOLVER_MIN_MOVES else None)
+            result = ai.poll()
+            if result is not None:
+                if stats is not None:
+                    stats.finish(game="connect_four")
+                ai_move = (result[0], pygame.time.get_ticks() + AI_MOVE_DELAY_MS)
+
+        if ai_move is not None and pygame.time.get_ticks() >= ai_move[1]:
+            col = ai_move[0]
+            ai_move = None
             if is_valid_location(board, col):
-                pygame.time.wait(500)
                 row = get_next_open_row(board, col)
                 drop_piece(board, row, col, AI_PIECE)
 
@@ -268,8 +174,15 @@ def main():
                 turn += 1
                 turn = turn % 2
 
+                if not game_over:
+                    pondered = {}
+                    ai.start(ponder, board.copy(), pondered)
+                    pondering = True
+
         if game_over:
             pygame.time.wait(3000)
 
+    ai.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,15 +1,13 @@
 import pygame
 import sys
-from math import inf as infinity
 from random import choice
-import time
 
-# Inicialização do Pygame
-pygame.init()
+from engine.tic_tac_toe import BOARD_SIZE, HUMAN, COMP, wins, game_over, empty_cells
+from engine.tic_tac_toe_table import get_table, perfect_move
+from engine.tic_tac_toe import valid_move as engine_valid_move, set_move as engine_set_move
 
 # Constantes com tema retrô aprimorado
 WIDTH, HEIGHT = 600, 700
-BOARD_SIZE = 3
 CELL_SIZE = WIDTH // BOARD_SIZE
 
 # Cores retrô melhoradas
@@ -25,12 +23,11 @@ BUTTON_HOVER_COLOR = (130, 130, 230)  # Azul mais claro
 TITLE_COLOR = (255, 70, 70)  # Vermelho neon combinando com X
 GLOW_COLOR = (100, 255, 100, 50)  # Efeito de brilho
 
-# Configuração da janela
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Jogo da Velha Retro")
-font = pygame.font.SysFont('Courier New', 60, bold=True)  # Fonte maior
-small_font = pygame.font.SysFont('Courier New', 36, bold=True)  # Fonte média
-button_font = pygame.font.SysFont('Courier New', 30, bold=True)  # Fonte de botão
+# Janela e fontes, criadas em main() para que importar o módulo não abra uma janela
+screen = None
+font = None
+small_font = None
+button_font = None
 
 # Efeito de scanlines melhorado
 def draw_scanlines():
@@ -46,99 +43,17 @@ def draw_glow(pos, radius, color):
     screen.blit(overlay, (0, 0))
 
 # Variáveis do jogo (mantidas da versão original)
-cont = 0
-total = 0
-HUMAN = -1
-COMP = +1
 board = [
     [0, 0, 0],
     [0, 0, 0],
     [0, 0, 0],
 ]
 
-# Funções do jogo (mantidas da versão original)
-def evaluate(state):
-    if wins(state, COMP):
-        score = +1
-    elif wins(state, HUMAN):
-        score = -1
-    else:
-        score = 0
-    return score
-
-def wins(state, player):
-    win_state = [
-        [state[0][0], state[0][1], state[0][2]],
-        [state[1][0], state[1][1], state[1][2]],
-        [state[2][0], state[2][1], state[2][2]],
-        [state[0][0], state[1][0], state[2][0]],
-        [state[0][1], state[1][1], state[2][1]],
-        [state[0][2], state[1][2], state[2][2]],
-        [state[0][0], state[1][1], state[2][2]],
-        [state[2][0], state[1][1], state[0][2]],
-    ]
-    if [player, player, player] in win_state:
-        return True
-    else:
-        return False
-
-def game_over(state):
-    return wins(state, HUMAN) or wins(state, COMP)
-
-def empty_cells(state):
-    cells = []
-    for x, row in enumerate(state):
-        for y, cell in enumerate(row):
-            if cell == 0:
-                cells.append([x, y])
-    return cells
-
 def valid_move(x, y):
-    if [x, y] in empty_cells(board):
-        return True
-    else:
-        return False
+    return engine_valid_move(board, x, y)
 
 def set_move(x, y, player):
-    if valid_move(x, y):
-        board[x][y] = player
-        return True
-    else:
-        return False
-
-def minimax(state, depth, alpha, beta, player):
-    global cont
-    if player == COMP:
-        best = [-1, -1, -infinity]
-    else:
-        best = [-1, -1, +infinity]
-
-    if depth == 0 or game_over(state):
-        score = evaluate(state)
-        return [-1, -1, score]
-
-    for cell in empty_cells(state):
-        x, y = cell[0], cell[1]
-        state[x][y] = player
-        score = minimax(state, depth - 1, alpha, beta, -player)
-        state[x][y] = 0
-        score[0], score[1] = x, y
-
-        if player == COMP:
-            if score[2] > best[2]:
-                best = score
-            alpha = max(alpha, score[2])
-            if beta <= alpha:
-                break
-        else:
-            if score[2] < best[2]:
-                best = score
-            beta = min(beta, score[2])
-            if beta <= alpha:
-                break
-
-    cont = cont + 1
-    return best
+    return engine_set_move(board, x, y, player)
 
 def reset_board():
     global board
@@ -361,88 +276,105 @@ start_button_hover = False
 restart_button_hover = False
 
 # Loop principal
-running = True
-while running:
-    mouse_pos = pygame.mouse.get_pos()
+def main():
+    global screen, font, small_font, button_font
+    global game_state, h_choice, c_choice, first
+    global x_button_hover, o_button_hover, human_first_button_hover
+    global comp_first_button_hover, start_button_hover, restart_button_hover
+
+    # Inicialização do Pygame e configuração da janela
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Jogo da Velha Retro")
+    font = pygame.font.SysFont('Courier New', 60, bold=True)  # Fonte maior
+    small_font = pygame.font.SysFont('Courier New', 36, bold=True)  # Fonte média
+    button_font = pygame.font.SysFont('Courier New', 30, bold=True)  # Fonte de botão
+
+    # Tabela de jogo perfeito, construída uma vez antes da primeira jogada da IA
+    get_table()
+
+    running = True
+    while running:
+        mouse_pos = pygame.mouse.get_pos()
     
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
         
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if game_state == MENU:
-                # Seleção de símbolo
-                if x_button_rect.collidepoint(mouse_pos):
-                    h_choice = 'X'
-                    c_choice = 'O'
-                elif o_button_rect.collidepoint(mouse_pos):
-                    h_choice = 'O'
-                    c_choice = 'X'
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if game_state == MENU:
+                    # Seleção de símbolo
+                    if x_button_rect.collidepoint(mouse_pos):
+                        h_choice = 'X'
+                        c_choice = 'O'
+                    elif o_button_rect.collidepoint(mouse_pos):
+                        h_choice = 'O'
+                        c_choice = 'X'
                 
-                # Quem começa
-                elif human_first_button_rect.collidepoint(mouse_pos):
-                    first = 'S'
-                elif comp_first_button_rect.collidepoint(mouse_pos):
-                    first = 'N'
+                    # Quem começa
+                    elif human_first_button_rect.collidepoint(mouse_pos):
+                        first = 'S'
+                    elif comp_first_button_rect.collidepoint(mouse_pos):
+                        first = 'N'
                 
-                # Iniciar jogo
-                elif start_button_rect.collidepoint(mouse_pos) and h_choice and first:
-                    reset_board()
-                    game_state = PLAYING
-                    if first == 'N':
-                        # Computador joga primeiro
-                        depth = len(empty_cells(board))
-                        if depth == 9:
-                            x = choice([0, 1, 2])
-                            y = choice([0, 1, 2])
-                        else:
-                            move = minimax(board, depth, -infinity, infinity, COMP)
-                            x, y = move[0], move[1]
-                        set_move(x, y, COMP)
+                    # Iniciar jogo
+                    elif start_button_rect.collidepoint(mouse_pos) and h_choice and first:
+                        reset_board()
+                        game_state = PLAYING
+                        if first == 'N':
+                            # Computador joga primeiro
+                            depth = len(empty_cells(board))
+                            if depth == 9:
+                                x = choice([0, 1, 2])
+                                y = choice([0, 1, 2])
+                            else:
+                                (x, y), _ = perfect_move(board)
+                            set_move(x, y, COMP)
             
-            elif game_state == PLAYING:
-                # Jogada do humano
-                if len(empty_cells(board)) > 0 and not game_over(board):
-                    x, y = mouse_pos[0] // CELL_SIZE, mouse_pos[1] // CELL_SIZE
-                    if valid_move(y, x):
-                        set_move(y, x, HUMAN)
+                elif game_state == PLAYING:
+                    # Jogada do humano
+                    if len(empty_cells(board)) > 0 and not game_over(board):
+                        x, y = mouse_pos[0] // CELL_SIZE, mouse_pos[1] // CELL_SIZE
+                        if valid_move(y, x):
+                            set_move(y, x, HUMAN)
                         
-                        # Verifica se o jogo acabou após a jogada do humano
-                        if not game_over(board) and len(empty_cells(board)) > 0:
-                            # Jogada do computador
-                            depth = len(empty_cells(board))
-                            if depth > 0:
-                                move = minimax(board, depth, -infinity, infinity, COMP)
-                                x, y = move[0], move[1]
-                                set_move(x, y, COMP)
+                            # Verifica se o jogo acabou após a jogada do humano
+                            if not game_over(board) and len(empty_cells(board)) > 0:
+                                # Jogada do computador
+                                if len(empty_cells(board)) > 0:
+                                    (x, y), _ = perfect_move(board)
+                                    set_move(x, y, COMP)
             
-            elif game_state == GAME_OVER:
-                if restart_button_rect.collidepoint(mouse_pos):
-                    game_state = MENU
-                    h_choice = ''
-                    c_choice = ''
-                    first = ''
-                    reset_board()  # Resetar o tabuleiro ao voltar ao menu
+                elif game_state == GAME_OVER:
+                    if restart_button_rect.collidepoint(mouse_pos):
+                        game_state = MENU
+                        h_choice = ''
+                        c_choice = ''
+                        first = ''
+                        reset_board()  # Resetar o tabuleiro ao voltar ao menu
     
-    # Atualiza estados de hover
-    if game_state == MENU:
-        x_button_hover = x_button_rect.collidepoint(mouse_pos)
-        o_button_hover = o_button_rect.collidepoint(mouse_pos)
-        human_first_button_hover = human_first_button_rect.collidepoint(mouse_pos)
-        comp_first_button_hover = comp_first_button_rect.collidepoint(mouse_pos)
-        start_button_hover = start_button_rect.collidepoint(mouse_pos) and h_choice and first
-    elif game_state == GAME_OVER:
-        restart_button_hover = restart_button_rect.collidepoint(mouse_pos)
+        # Atualiza estados de hover
+        if game_state == MENU:
+            x_button_hover = x_button_rect.collidepoint(mouse_pos)
+            o_button_hover = o_button_rect.collidepoint(mouse_pos)
+            human_first_button_hover = human_first_button_rect.collidepoint(mouse_pos)
+            comp_first_button_hover = comp_first_button_rect.collidepoint(mouse_pos)
+            start_button_hover = start_button_rect.collidepoint(mouse_pos) and h_choice and first
+        elif game_state == GAME_OVER:
+            restart_button_hover = restart_button_rect.collidepoint(mouse_pos)
     
-    # Renderiza o estado atual do jogo
-    if game_state == MENU:
-        show_menu()
-    elif game_state == PLAYING:
-        if game_over(board) or len(empty_cells(board)) == 0:
-            game_state = GAME_OVER
-        draw_board()
-    elif game_state == GAME_OVER:
-        draw_board()
+        # Renderiza o estado atual do jogo
+        if game_state == MENU:
+            show_menu()
+        elif game_state == PLAYING:
+            if game_over(board) or len(empty_cells(board)) == 0:
+                game_state = GAME_OVER
+            draw_board()
+        elif game_state == GAME_OVER:
+            draw_board()
+
+    pygame.quit()
+    sys.exit()
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import inf
+
+from engine import checkers, connect_four, tic_tac_toe
+from engine.opening_book import OpeningBook
+from engine.search import Deadline, SearchTimeout
+from engine.solver import Solver, plies_to_end
+from engine.stats import SearchStats
+from engine.tablebase import Tablebase
+from engine.tournament import GAMES, SQUARE_NUMBERS
+from engine.transposition import TranspositionTable
+
+# Análise em lote sem interface: lê posições, uma por linha, de um arquivo ou
+# da entrada padrão e escreve uma linha JSON por posição (melhor jogada,
+# pontuação, profundidade, nós e tempo), na ordem da entrada e assim que cada
+# uma fica pronta. As posições são analisadas em processos; a leitura só
+# avança quando há vaga entre as BACKLOG posições em andamento por processo,
+# então a memória não cresce com o tamanho da entrada.
+#
+# Codificação das posições (a mesma dos logs de engine.tournament):
+#   checkers      tabuleiro de from_string e o lado a jogar (w ou b), ex.:
+#                 ".b.b.b/b.b.b./....../....../.w.w.w/w.w.w. w"
+#   connect_four  colunas jogadas a partir de 1, ex.: 4453 ("-" é o tabuleiro
+#                 vazio); quem joga a seguir é quem a string não terminou
+#   tic_tac_toe   casas jogadas alternando a partir das brancas, ex.: "b2 a1"
+# Linhas vazias e começadas por "#" são ignoradas.
+DEFAULT_DEPTHS = {"checkers": 8, "connect_four": 10, "tic_tac_toe": 9}
+BACKLOG = 4
+
+def parse_checkers(text):
+    board, _, side = text.rpartition(" ")
+    if not board:
+        board, side = side, "w"
+    if side not in ("w", "b"):
+        raise ValueError(f"Lado a jogar inválido {side!r} (w ou b)")
+    return checkers.from_string(board), checkers.WHITE if side == "w" else checkers.BLACK
+
+def parse_tic_tac_toe(text):
+    # Retorna (tabuleiro, jogador a jogar)
+    state = tic_tac_toe.create_board()
+    player = tic_tac_toe.COMP
+    for cell in text.split():
+        if len(cell) != 2 or cell[0] not in "abc" or cell[1] not in "123":
+            raise ValueError(f"Casa inválida {cell!r}")
+        x, y = int(cell[1]) - 1, "abc".index(cell[0])
+        if state[x][y] or tic_tac_toe.game_over(state):
+            raise ValueError(f"Jogada inválida {cell!r}")
+        state[x][y] = player
+        player = -player
+    return state, player
+
+def checkers_notation(move):
+    frm, to, captured = move
+    return f"{SQUARE_NUMBERS[frm]}{'x' if captured else '-'}{SQUARE_NUMBERS[to]}"
+
+class Analyzer:
+    # Estado de um processo de análise: tabelas, tabela de finais, livro e
+    # solucionador, reaproveitados entre posições. As tabelas de transposição
+    # (a da busca e a do solucionador) são limpas a cada posição, para que o
+    # resultado e os nós não dependam de quais posições o processo analisou antes
+    def __init__(self, game, depth=None, time_budget_ms=None, tablebase=None, book=None, solve=None):
+        self.game = game
+        self.depth = depth if depth is not None else DEFAULT_DEPTHS[game]
+        self.time_budget_ms = time_budget_ms
+        self.tablebase = Tablebase(tablebase) if tablebase else None
+        self.book = OpeningBook(book) if book else None
+        # None, "strong" ou "weak": Connect Four pelo solucionador exato
+        self.solve = solve
+        self.solver = Solver() if solve else None
+        self.table = TranspositionTable()
+        self.ordering = checkers.MoveOrdering()
+
+    def analyze(self, text):
+        # Dicionário com o resultado; ValueError se a posição for inválida, já
+        # estiver decidida ou se o solucionador não terminar dentro de --time
+        self.table.clear()
+        start = time.perf_counter()
+        result = getattr(self, "_" + self.game)(text)
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def _connect_four(self, text):
+        board = connect_four.from_moves("" if text == "-" else text)
+        if connect_four.is_terminal_node(board):
+            raise ValueError("Posição terminal")
+        if self.solver is not None:
+            self.solver.clear()
+            self.solver.nodes = 0
+            deadline = Deadline(self.time_budget_ms) if self.time_budget_ms is not None else None
+            try:
+                col, score = self.solver.best_move(board, weak=self.solve == "weak", deadline=deadline)
+            except SearchTimeout:
+                raise ValueError(f"Solucionador sem resultado em {self.time_budget_ms} ms") from None
+            result = {"move": str(col + 1), "score": score, "nodes": self.solver.nodes,
+                      "result": "win" if score > 0 else "loss" if score < 0 else "draw"}
+            if self.solve == "strong":
+                result["plies"] = plies_to_end(score, board.moves)
+            return result
+        stats = SearchStats()
+        if self.time_budget_ms is not None:
+            col, score, depth = connect_four.search(board, self.time_budget_ms, self.table, self.book, stats)
+        else:
+            entry = self.book.probe(board) if self.book is not None else None
+            if entry is not None:
+                (col, score), depth = entry, self.book.depth
+            else:
+                depth = self.depth
+                col, score = connect_four.pvs(board, depth, -inf, inf, True, self.table, stats=stats)
+        return {"move": str(col + 1), "score": score, "depth": depth, "nodes": stats.nodes}
+
+    def _checkers(self, text):
+        position, side = parse_checkers(text)
+        if position.winner() is not None:
+            raise ValueError("Posição terminal")
+        stats = SearchStats()
+        max_player = side == checkers.WHITE
+        if self.time_budget_ms is not None:
+            move, score, depth = checkers.search(position, self.time_budget_ms, max_player, self.table, self.ordering,
+                                                 self.tablebase, stats)
+        else:
+            self.ordering.clear()
+            depth = self.depth
+            score, move = checkers.minimax(position.copy(), depth, -inf, inf, max_player, stats=stats, table=self.table,
+                                           ordering=self.ordering, tablebase=self.tablebase)
+        return {"move": checkers_notation(move), "score": score, "depth": depth, "nodes": stats.nodes}
+
+    def _tic_tac_toe(self, text):
+        state, player = parse_tic_tac_toe("" if text == "-" else text)
+        if tic_tac_toe.game_over(state) or not tic_tac_toe.empty_cells(state):
+            raise ValueError("Posição terminal")
+        stats = SearchStats()
+        if self.time_budget_ms is not None:
+            (x, y), score, depth = tic_tac_toe.search(state, self.time_budget_ms, player, stats)
+        else:
+            depth = min(self.depth, len(tic_tac_toe.empty_cells(state)))
+            x, y, score = tic_tac_toe.minimax(state, depth, -inf, inf, player, stats=stats)
+        return {"move": f"{'abc'[y]}{x + 1}", "score": score, "depth": depth, "nodes": stats.nodes}
+
+# Analisador do processo, criado por _init_worker
+_analyzer = None
+
+def _init_worker(game, options):
+    global _analyzer
+    _analyzer = Analyzer(game, **options)
+
+def _analyze(number, text):
+    record = {"line": number, "position": text}
+    try:
+        record.update(_analyzer.analyze(text))
+    except ValueError as error:
+        record["error"] = str(error)
+    return record
+
+def positions(lines):
+    # (número da linha, texto) das linhas com posição
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if text and not text.startswith("#"):
+            yield number, text
+
+def analyze_stream(game, lines, options, workers=None):
+    # Gera os resultados na ordem da entrada. workers=0 analisa no próprio
+    # processo; senão, no máximo BACKLOG posições por processo ficam em
+    # andamento ou esperando a vez de sair
+    if workers == 0:
+        _init_worker(game, options)
+        for number, text in positions(lines):
+            yield _analyze(number, text)
+        return
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(game, options)) as executor:
+        pending = deque()
+        try:
+            for number, text in positions(lines):
+                pending.append(executor.submit(_analyze, number, text))
+                if len(pending) >= workers * BACKLOG:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Saída antecipada (erro, saída fechada): não espera o que sobrou
+            for future in pending:
+                future.cancel()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisa posições em lote e escreve uma linha JSON por posição.")
+    parser.add_argument("game", choices=GAMES)
+    parser.add_argument("input", nargs="?", default="-", help="arquivo com uma posição por linha (- para a entrada padrão)")
+    parser.add_argument("--output", help="arquivo de saída (padrão: saída padrão)")
+    parser.add_argument("--depth", type=int, help="profundidade fixa (padrão por jogo: " +
+                        ", ".join(f"{game} {depth}" for game, depth in DEFAULT_DEPTHS.items()) + ")")
+    parser.add_argument("--time", type=int, help="tempo por posição em ms, com aprofundamento iterativo, em vez de --depth")
+    parser.add_argument("--tablebase", help="tabela de finais das damas (engine.tablebase)")
+    parser.add_argument("--book", help="livro de aberturas do Connect Four (engine.opening_book)")
+    parser.add_argument("--solve", choices=["strong", "weak"],
+                        help="Connect Four pelo solucionador exato: pontuação e distância (strong) ou só o resultado (weak)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos (0 analisa sem processos extras)")
+    args = parser.parse_args(argv)
+    if args.depth is not None and args.time is not None:
+        parser.error("use --depth ou --time, não os dois")
+    if args.tablebase and args.game != "checkers" or (args.book or args.solve) and args.game != "connect_four":
+        parser.error("--tablebase é só para checkers; --book e --solve, só para connect_four")
+    for path in (args.tablebase, args.book):
+        if path and not os.path.exists(path):
+            parser.error(f"arquivo não encontrado: {path}")
+
+    options = {"depth": args.depth, "time_budget_ms": args.time, "tablebase": args.tablebase, "book": args.book,
+               "solve": args.solve}
+    source = sys.stdin if args.input == "-" else open(args.input)
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for record in analyze_stream(args.game, source, options, args.workers):
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+    except BrokenPipeError:
+        # Saída fechada antes do fim (ex.: | head): sem traceback, e a saída
+        # padrão vai para /dev/null para que o flush na saída do Python não falhe
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
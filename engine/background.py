@@ -0,0 +1,63 @@
+import sys
+import threading
+from concurrent.futures import Future, wait
+
+# Busca da IA fora do laço de eventos das interfaces. A busca roda numa thread
+# daemon (compartilha a tabela de transposição do processo, e um ponder sem fim
+# não impede o processo de sair se a interface morrer) e o laço consulta o
+# resultado a cada quadro com poll(), sem bloquear. O cancelamento usa o
+# Deadline da busca: o evento é verificado a cada nó, então cancel() faz a
+# thread parar quase imediatamente (SearchCancelled) e o resultado é descartado.
+#
+# A busca é Python puro e disputa o GIL com o laço de eventos; com o intervalo
+# de troca padrão (5 ms) o laço perde quadros enquanto a IA pensa. Um intervalo
+# menor devolve o GIL ao laço com mais frequência, ao custo de alguns por cento
+# de nós por segundo na busca
+SWITCH_INTERVAL = 0.0005
+
+def _run(future, search, args, kwargs):
+    try:
+        future.set_result(search(*args, **kwargs))
+    except BaseException as error:
+        future.set_exception(error)
+
+class BackgroundSearch:
+    def __init__(self):
+        self.future = None
+        self.cancel_event = None
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(SWITCH_INTERVAL)
+
+    def start(self, search, *args, **kwargs):
+        # search(*args, cancel=evento, **kwargs) é uma das funções search (ou
+        # ponder) dos módulos do motor. A posição deve ser uma cópia que a
+        # interface não altera
+        self.cancel()
+        self.cancel_event = threading.Event()
+        self.future = Future()
+        threading.Thread(target=_run, args=(self.future, search, args, dict(kwargs, cancel=self.cancel_event)),
+                         name="busca", daemon=True).start()
+
+    def pending(self):
+        # Há uma busca cujo resultado ainda não foi retirado por poll()
+        return self.future is not None
+
+    def poll(self):
+        # Resultado da busca (o mesmo de search) quando estiver pronto, senão None
+        if self.future is None or not self.future.done():
+            return None
+        future, self.future = self.future, None
+        return future.result()
+
+    def cancel(self):
+        # Espera a thread sair da busca (uma fração de milissegundo), para que
+        # a interface possa mexer no jogo logo em seguida sem disputar com ela
+        # o cache de jogadas
+        if self.future is not None:
+            self.cancel_event.set()
+            wait([self.future])
+            self.future = None
+
+    def close(self):
+        self.cancel()
+        sys.setswitchinterval(self.switch_interval)
@@ -0,0 +1,99 @@
+import numpy as np
+
+from engine.connect_four import (
+    AI_PIECE, COLUMN_COUNT, COLUMN_HEIGHT, PLAYER_PIECE, ROW_COUNT, SEARCH_ORDER, WINDOW_LENGTH,
+    _score_of, winning_move,
+)
+
+# Avaliação do Connect Four em lote com NumPy, para análise de muitas posições de
+# uma vez. Os tabuleiros são arrays (N, ROW_COUNT, COLUMN_COUNT) no formato do
+# front end (linha 0 embaixo, 0 vazia, PLAYER_PIECE, AI_PIECE).
+
+# Índices (na grade achatada linha * COLUMN_COUNT + coluna) das 4 casas de cada
+# janela: horizontal, vertical, diagonal positiva e diagonal negativa
+WINDOW_INDEX = np.array([
+    [(r + i * dr) * COLUMN_COUNT + c + i * dc for i in range(WINDOW_LENGTH)]
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1))
+    for r in range(ROW_COUNT)
+    for c in range(COLUMN_COUNT)
+    if 0 <= r + (WINDOW_LENGTH - 1) * dr < ROW_COUNT and c + (WINDOW_LENGTH - 1) * dc < COLUMN_COUNT
+])
+
+CENTER_INDEX = np.arange(ROW_COUNT) * COLUMN_COUNT + COLUMN_COUNT // 2
+
+# WINDOW_SCORES[peças próprias, peças do adversário], tirado de evaluate_window
+WINDOW_SCORES = np.array([
+    [_score_of(own, opp) if own + opp <= WINDOW_LENGTH else 0 for opp in range(WINDOW_LENGTH + 1)]
+    for own in range(WINDOW_LENGTH + 1)
+], dtype=np.int64)
+
+# Bit do bitboard de cada casa da grade achatada
+BIT_INDEX = np.array([c * COLUMN_HEIGHT + r for r in range(ROW_COUNT) for c in range(COLUMN_COUNT)], dtype=np.uint64)
+
+def score_boards(boards, piece=AI_PIECE):
+    # score_position para cada um dos N tabuleiros, num array (N,) de inteiros
+    boards = np.asarray(boards).reshape(-1, ROW_COUNT * COLUMN_COUNT)
+    opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+    windows = boards[:, WINDOW_INDEX]
+    own = np.count_nonzero(windows == piece, axis=2)
+    opp = np.count_nonzero(windows == opponent, axis=2)
+    scores = WINDOW_SCORES[own, opp].sum(axis=1)
+    scores += 3 * np.count_nonzero(boards[:, CENTER_INDEX] == piece, axis=1)
+    return scores
+
+def boards_from_bitboards(player_bitboards, ai_bitboards):
+    # Converte listas de bitboards (Position.bitboards) num array (N, 6, 7)
+    player = np.asarray(player_bitboards, dtype=np.uint64)[:, None] >> BIT_INDEX & np.uint64(1)
+    ai = np.asarray(ai_bitboards, dtype=np.uint64)[:, None] >> BIT_INDEX & np.uint64(1)
+    boards = (player * PLAYER_PIECE + ai * AI_PIECE).astype(np.int8)
+    return boards.reshape(-1, ROW_COUNT, COLUMN_COUNT)
+
+def to_boards(positions):
+    return boards_from_bitboards(
+        [position.bitboards[PLAYER_PIECE] for position in positions],
+        [position.bitboards[AI_PIECE] for position in positions],
+    )
+
+def frontier_minimax(board, depth, maximizingPlayer=True):
+    # Minimax de largura completa (sem poda) que junta todas as folhas da última
+    # camada e as avalia numa única chamada a score_boards. Mesmo contrato e mesmo
+    # valor de connect_four.minimax: (coluna, pontuação do ponto de vista da IA)
+    player_bitboards, ai_bitboards = [], []
+
+    def expand(depth, maximizing):
+        # Retorna a folha (índice no lote), o valor terminal ou os filhos do nó
+        if winning_move(board, AI_PIECE):
+            return 100000000000000
+        if winning_move(board, PLAYER_PIECE):
+            return -10000000000000
+        if board.moves == ROW_COUNT * COLUMN_COUNT:
+            return 0
+        if depth == 0:
+            player_bitboards.append(board.bitboards[PLAYER_PIECE])
+            ai_bitboards.append(board.bitboards[AI_PIECE])
+            return [len(player_bitboards) - 1]
+        piece = AI_PIECE if maximizing else PLAYER_PIECE
+        children = []
+        for col in SEARCH_ORDER:
+            if board.can_play(col):
+                board.make_move(col, piece)
+                children.append((col, expand(depth - 1, not maximizing)))
+                board.unmake_move(col)
+        return (maximizing, children)
+
+    def back_up(node, scores):
+        if isinstance(node, int):
+            return None, node
+        if isinstance(node, list):
+            return None, int(scores[node[0]])
+        maximizing, children = node
+        column, value = None, None
+        for col, child in children:
+            score = back_up(child, scores)[1]
+            if value is None or (score > value if maximizing else score < value):
+                column, value = col, score
+        return column, value
+
+    tree = expand(depth, maximizingPlayer)
+    scores = score_boards(boards_from_bitboards(player_bitboards, ai_bitboards)) if player_bitboards else None
+    return back_up(tree, scores)
@@ -0,0 +1,235 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from math import inf
+
+from engine import checkers, connect_four, tic_tac_toe
+from engine.parallel import ParallelSearch
+from engine.stats import SearchStats
+from engine.transposition import TranspositionTable
+
+# Corpus fixo de posições. Connect Four: colunas jogadas (a IA joga a seguir).
+CONNECT_FOUR_POSITIONS = [
+    ("opening", ""),
+    ("opening", "44"),
+    ("midgame", "4435414454"),
+    ("midgame", "443154444353"),
+    ("endgame", "4431544443533216133765"),
+    ("endgame", "44315444435332161337655255"),
+]
+
+# Damas: (fase, tabuleiro em from_string, lado a jogar)
+CHECKERS_POSITIONS = [
+    ("opening", ".b.b.b/b.b.b./....../....../.w.w.w/w.w.w.", checkers.WHITE),
+    ("opening", ".b.b.b/b.b.b./....../.w..../...w.w/w.w.w.", checkers.BLACK),
+    ("midgame", ".....b/b.b.../.b...b/..w.../.w.w../w...w.", checkers.WHITE),
+    ("midgame", ".....b/b.b.b./....../..w.../...w.w/..w...", checkers.BLACK),
+    ("endgame", "...W.b/....../....../....w./....../..B...", checkers.WHITE),
+    ("endgame", ".....b/....../.....W/....w./....../..B...", checkers.BLACK),
+]
+
+DEFAULT_DEPTHS = {"connect_four": 10, "checkers": 7}
+DEFAULT_WORKERS = [1, 2, 4, 8]
+
+# Medições mais curtas que isto são dominadas por ruído e não entram na detecção de regressões
+MIN_COMPARE_SECONDS = 0.01
+
+def measure(run):
+    stats = SearchStats()
+    start = time.perf_counter()
+    move, score = run(stats)
+    seconds = time.perf_counter() - start
+    result = stats.as_dict()
+    result.update({
+        "seconds": seconds,
+        "nodes_per_second": stats.nodes / seconds if seconds else 0.0,
+        "move": move,
+        "score": score,
+    })
+    return result
+
+def bench_connect_four(max_depth):
+    for phase, moves in CONNECT_FOUR_POSITIONS:
+        board = connect_four.from_moves(moves)
+        for depth in range(1, max_depth + 1):
+            # Tabela nova a cada profundidade, para que as medições sejam independentes
+            table = TranspositionTable()
+            result = measure(lambda stats: connect_four.minimax(board, depth, -inf, inf, True, table, stats=stats))
+            yield dict(game="connect_four", phase=phase, position=moves, depth=depth, **result)
+
+def bench_connect_four_parallel(depth, worker_counts):
+    # Aceleração da busca paralela na raiz em relação à busca sequencial, na mesma profundidade
+    for phase, moves in CONNECT_FOUR_POSITIONS:
+        board = connect_four.from_moves(moves)
+        table = TranspositionTable()
+        sequential = measure(lambda stats: connect_four.minimax(board, depth, -inf, inf, True, table, stats=stats))
+        yield dict(game="connect_four_parallel", phase=phase, position=moves, depth=depth, workers=0, speedup=1.0, **sequential)
+        for workers in worker_counts:
+            # Processos novos (com tabelas vazias) a cada medição, iniciados antes de medir
+            with ParallelSearch(workers) as parallel:
+                parallel.warm_up()
+                result = measure(lambda stats: parallel.minimax(board, depth, stats=stats))
+            speedup = sequential["seconds"] / result["seconds"] if result["seconds"] else 0.0
+            yield dict(game="connect_four_parallel", phase=phase, position=moves, depth=depth, workers=workers, speedup=speedup, **result)
+
+def bench_connect_four_pvs(max_depth):
+    # pvs (negascout) contra minimax na mesma profundidade: mesma pontuação, menos nós
+    for phase, moves in CONNECT_FOUR_POSITIONS:
+        board = connect_four.from_moves(moves)
+        for depth in range(1, max_depth + 1):
+            table = TranspositionTable()
+            reference = measure(lambda stats: connect_four.minimax(board, depth, -inf, inf, True, table, stats=stats))
+            table = TranspositionTable()
+            result = measure(lambda stats: connect_four.pvs(board, depth, -inf, inf, True, table, stats=stats))
+            reduction = 1 - result["nodes"] / reference["nodes"] if reference["nodes"] else 0.0
+            yield dict(game="connect_four_pvs", phase=phase, position=moves, depth=depth, node_reduction=reduction, **result)
+
+def bench_checkers(max_depth):
+    for phase, text, side in CHECKERS_POSITIONS:
+        position = checkers.from_string(text)
+        for depth in range(1, max_depth + 1):
+            def run(stats):
+                # Tabela, heurísticas de ordenação e cache de jogadas novos a cada profundidade
+                checkers.move_cache.clear()
+                score, move = checkers.minimax(position, depth, -inf, inf, side == checkers.WHITE, stats=stats,
+                                               table=TranspositionTable(), ordering=checkers.MoveOrdering())
+                return move, score
+            result = measure(run)
+            result["move_cache_hit_rate"] = checkers.move_cache.hit_rate()
+            yield dict(game="checkers", phase=phase, position=text, depth=depth, **result)
+
+def reachable_states():
+    # Todos os estados não terminais alcançáveis, com quem joga, a partir do
+    # tabuleiro vazio começando por qualquer um dos jogadores
+    seen = set()
+    states = []
+
+    def visit(state, player):
+        key = (tuple(cell for row in state for cell in row), player)
+        if key in seen:
+            return
+        seen.add(key)
+        if tic_tac_toe.game_over(state) or not tic_tac_toe.empty_cells(state):
+            return
+        states.append(([row[:] for row in state], player))
+        for x, y in tic_tac_toe.empty_cells(state):
+            state[x][y] = player
+            visit(state, -player)
+            state[x][y] = 0
+
+    for first in (tic_tac_toe.COMP, tic_tac_toe.HUMAN):
+        visit(tic_tac_toe.create_board(), first)
+    return states
+
+def bench_tic_tac_toe():
+    # Busca completa em cada estado alcançável, agregada por número de casas vazias
+    totals = {}
+    for state, player in reachable_states():
+        depth = len(tic_tac_toe.empty_cells(state))
+        stats = SearchStats()
+        start = time.perf_counter()
+        tic_tac_toe.minimax(state, depth, -inf, inf, player, stats=stats)
+        seconds = time.perf_counter() - start
+        total = totals.setdefault(depth, {"positions": 0, "nodes": 0, "expanded": 0, "cutoffs": 0, "seconds": 0.0})
+        total["positions"] += 1
+        total["nodes"] += stats.nodes
+        total["expanded"] += stats.expanded
+        total["cutoffs"] += stats.cutoffs
+        total["seconds"] += seconds
+
+    for depth in sorted(totals):
+        total = totals[depth]
+        expanded, seconds = total["expanded"], total["seconds"]
+        yield dict(
+            game="tic_tac_toe", phase="all", position="reachable", positions=total["positions"], depth=depth,
+            nodes=total["nodes"], expanded=expanded, cutoffs=total["cutoffs"],
+            branching_factor=(total["nodes"] - total["positions"]) / expanded if expanded else 0.0,
+            cutoff_rate=total["cutoffs"] / expanded if expanded else 0.0,
+            seconds=seconds, nodes_per_second=total["nodes"] / seconds if seconds else 0.0,
+            move=None, score=None,
+        )
+
+def run(games, depths, worker_counts=DEFAULT_WORKERS):
+    benches = {
+        "connect_four": lambda: bench_connect_four(depths["connect_four"]),
+        "connect_four_parallel": lambda: bench_connect_four_parallel(depths["connect_four"], worker_counts),
+        "connect_four_pvs": lambda: bench_connect_four_pvs(depths["connect_four"]),
+        "checkers": lambda: bench_checkers(depths["checkers"]),
+        "tic_tac_toe": bench_tic_tac_toe,
+    }
+    for game in games:
+        for result in benches[game]():
+            print_row(result)
+            yield result
+
+def print_row(result):
+    print(
+        f"{result['game']:<13} {result['phase']:<8} {result['position'][:26]:<26} d={result['depth']:<2} "
+        f"nós={result['nodes']:>9} nós/s={result['nodes_per_second']:>9.0f} "
+        f"ramificação={result['branching_factor']:5.2f} cortes={result['cutoff_rate']:5.1%} "
+        f"tempo={result['seconds']:8.3f}s"
+        + (f" processos={result['workers'] or '-'} aceleração=x{result['speedup']:.2f}" if "workers" in result else "")
+        + (f" cache={result['move_cache_hit_rate']:5.1%}" if "move_cache_hit_rate" in result else "")
+        + (f" redução={result['node_reduction']:5.1%}" if "node_reduction" in result else ""),
+        flush=True,
+    )
+
+def compare(results, baseline, tolerance):
+    # Compara com uma execução anterior; retorna o número de regressões de velocidade
+    previous = {(r["game"], r["position"], r["depth"], r.get("workers")): r for r in baseline["results"]}
+    regressions = 0
+    print("\nComparação com a execução anterior (nós e nós/s, atual / anterior):")
+    for result in results:
+        old = previous.get((result["game"], result["position"], result["depth"], result.get("workers")))
+        if old is None or not old["nodes"] or not old["nodes_per_second"]:
+            continue
+        nodes_ratio = result["nodes"] / old["nodes"]
+        speed_ratio = result["nodes_per_second"] / old["nodes_per_second"]
+        time_ratio = result["seconds"] / old["seconds"] if old["seconds"] else 1.0
+        regression = old["seconds"] >= MIN_COMPARE_SECONDS and time_ratio > 1 + tolerance
+        regressions += regression
+        print(
+            f"{result['game']:<13} {result['position'][:26]:<26} d={result['depth']:<2} "
+            f"nós x{nodes_ratio:5.2f} nós/s x{speed_ratio:5.2f} tempo x{time_ratio:5.2f}"
+            + ("  REGRESSÃO" if regression else "")
+        )
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das buscas minimax: nós, nós/s, ramificação, cortes e tempo por profundidade.")
+    parser.add_argument("--games", nargs="+", choices=["connect_four", "connect_four_parallel", "connect_four_pvs", "checkers", "tic_tac_toe"],
+                        default=["connect_four", "checkers", "tic_tac_toe"])
+    parser.add_argument("--connect-four-depth", type=int, default=DEFAULT_DEPTHS["connect_four"])
+    parser.add_argument("--checkers-depth", type=int, default=DEFAULT_DEPTHS["checkers"])
+    parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS,
+                        help="números de processos medidos em connect_four_parallel")
+    parser.add_argument("--output", help="arquivo JSON com os resultados")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="aumento de tempo tolerado na comparação antes de acusar regressão")
+    args = parser.parse_args(argv)
+
+    depths = {"connect_four": args.connect_four_depth, "checkers": args.checkers_depth}
+    results = list(run(args.games, depths, args.workers))
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,718 @@
+import random
+from array import array
+from collections import OrderedDict
+
+from engine.search import iterative_deepening, pondering
+from engine.transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+# Regras e busca das damas sem nenhuma dependência de pygame. O tabuleiro é um
+# array de ROWS * COLS casas (casa = linha * COLS + coluna) com um código por peça:
+# 0 vazia, +1/-1 peça branca/preta, +2/-2 dama branca/preta.
+ROWS, COLS = 6, 6
+
+EMPTY = 0
+WHITE = 1
+BLACK = -1
+KING = 2
+
+MAX_SEARCH_DEPTH = 64
+
+DIRECTIONS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+# Notação textual das casas, usada por from_string/to_string
+PIECE_CHARS = {EMPTY: '.', WHITE: 'w', WHITE * KING: 'W', BLACK: 'b', BLACK * KING: 'B'}
+CHAR_PIECES = {char: piece for piece, char in PIECE_CHARS.items()}
+
+def square(row, col):
+    return row * COLS + col
+
+def color_of(piece):
+    return WHITE if piece > 0 else BLACK
+
+def _tables():
+    # Para cada casa e direção (na ordem de DIRECTIONS): casa vizinha, casa de
+    # chegada do salto (-1 fora do tabuleiro) e o raio de casas até a borda
+    neighbors, jumps, rays = [], [], []
+    for row in range(ROWS):
+        for col in range(COLS):
+            neighbors.append([])
+            jumps.append([])
+            rays.append([])
+            for dr, dc in DIRECTIONS:
+                ray = []
+                r, c = row + dr, col + dc
+                while 0 <= r < ROWS and 0 <= c < COLS:
+                    ray.append(square(r, c))
+                    r, c = r + dr, c + dc
+                neighbors[-1].append(ray[0] if ray else -1)
+                jumps[-1].append(ray[1] if len(ray) > 1 else -1)
+                rays[-1].append(ray)
+    return neighbors, jumps, rays
+
+NEIGHBORS, JUMPS, KING_RAYS = _tables()
+
+# Direções (esquerda, direita) em que cada peça comum anda: brancas sobem, pretas descem
+FORWARD_DIRECTIONS = {WHITE: (0, 1), BLACK: (2, 3)}
+
+def _piece_value(color, king, row, col):
+    value = 1.5 if king else 1
+
+    center_bonus = 0.3 if 2 <= row <= 5 and 2 <= col <= 5 else 0
+
+    progress_bonus = (row / 7) * 0.2 if color == WHITE else ((7 - row) / 7) * 0.2
+
+    return value + center_bonus + progress_bonus
+
+# Valor de cada peça em cada casa, indexado pelo código da peça
+PIECE_VALUES = {
+    code: [_piece_value(color_of(code), abs(code) == KING, row, col) for row in range(ROWS) for col in range(COLS)]
+    for code in (WHITE, WHITE * KING, BLACK, BLACK * KING)
+}
+
+# Chaves de Zobrist por código de peça e casa: ZOBRIST[código][casa]; códigos
+# negativos indexam a partir do fim da lista, como no array do tabuleiro
+_zobrist_random = random.Random(20240602)
+ZOBRIST = [[_zobrist_random.getrandbits(64) for _ in range(ROWS * COLS)] for _ in range(2 * KING + 1)]
+# Chave extra para diferenciar quem joga (as pretas minimizam)
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+
+def zobrist_hash(squares):
+    key = 0
+    for sq, piece in enumerate(squares):
+        if piece:
+            key ^= ZOBRIST[piece][sq]
+    return key
+
+class Position:
+    __slots__ = ("squares", "white_left", "black_left", "white_kings", "black_kings", "hash")
+
+    def __init__(self):
+        self.squares = array('b', [EMPTY] * (ROWS * COLS))
+        self.white_left = self.black_left = 0
+        self.white_kings = self.black_kings = 0
+        for row in range(ROWS):
+            for col in range(COLS):
+                if row % 2 == (col + 1) % 2:
+                    if row < 2:
+                        self.squares[square(row, col)] = BLACK
+                        self.black_left += 1
+                    elif row > 3:
+                        self.squares[square(row, col)] = WHITE
+                        self.white_left += 1
+        # Hash de Zobrist das peças, atualizado a cada movimento e captura
+        self.hash = zobrist_hash(self.squares)
+
+    def copy(self):
+        position = Position.__new__(Position)
+        position.squares = array('b', self.squares)
+        position.white_left, position.black_left = self.white_left, self.black_left
+        position.white_kings, position.black_kings = self.white_kings, self.black_kings
+        position.hash = self.hash
+        return position
+
+    def get_piece(self, row, col):
+        return self.squares[square(row, col)]
+
+    def evaluate(self):
+        white_score = 0
+        black_score = 0
+
+        for sq, piece in enumerate(self.squares):
+            if piece > 0:
+                white_score += PIECE_VALUES[piece][sq]
+            elif piece < 0:
+                black_score += PIECE_VALUES[piece][sq]
+
+        white_moves = move_cache.movable(self, WHITE)
+        black_moves = move_cache.movable(self, BLACK)
+        mobility_score = (white_moves - black_moves) * 0.1
+
+        return white_score - black_score + mobility_score
+
+    def get_all_pieces(self, color):
+        if color == WHITE:
+            return [sq for sq, piece in enumerate(self.squares) if piece > 0]
+        return [sq for sq, piece in enumerate(self.squares) if piece < 0]
+
+    def move(self, frm, to):
+        # Move a peça e promove se chegar à última linha; retorna se houve promoção
+        piece = self.squares[frm]
+        self.squares[frm] = EMPTY
+        self.hash ^= ZOBRIST[piece][frm]
+        row = to // COLS
+        if abs(piece) != KING and ((piece == WHITE and row == 0) or (piece == BLACK and row == ROWS - 1)):
+            piece *= KING
+            self.squares[to] = piece
+            self.hash ^= ZOBRIST[piece][to]
+            if piece > 0:
+                self.white_kings += 1
+            else:
+                self.black_kings += 1
+            return True
+        self.squares[to] = piece
+        self.hash ^= ZOBRIST[piece][to]
+        return False
+
+    def remove(self, squares):
+        for sq in squares:
+            piece = self.squares[sq]
+            self.squares[sq] = EMPTY
+            if piece:
+                self.hash ^= ZOBRIST[piece][sq]
+            if piece < 0:
+                self.black_left -= 1
+                if piece == BLACK * KING:
+                    self.black_kings -= 1
+            elif piece > 0:
+                self.white_left -= 1
+                if piece == WHITE * KING:
+                    self.white_kings -= 1
+
+    def make_move(self, frm, to, captured):
+        # Retorna o registro (origem, destino, capturadas com seus códigos, promovida)
+        # usado por unmake_move
+        removed = [(sq, self.squares[sq]) for sq in captured]
+        promoted = self.move(frm, to)
+        if captured:
+            self.remove(captured)
+        return frm, to, removed, promoted
+
+    def unmake_move(self, undo):
+        frm, to, removed, promoted = undo
+        for sq, piece in removed:
+            self.squares[sq] = piece
+            self.hash ^= ZOBRIST[piece][sq]
+            if piece < 0:
+                self.black_left += 1
+                if piece == BLACK * KING:
+                    self.black_kings += 1
+            else:
+                self.white_left += 1
+                if piece == WHITE * KING:
+                    self.white_kings += 1
+
+        piece = self.squares[to]
+        self.squares[to] = EMPTY
+        self.hash ^= ZOBRIST[piece][to]
+        if promoted:
+            piece //= KING
+            if piece > 0:
+                self.white_kings -= 1
+            else:
+                self.black_kings -= 1
+        self.squares[frm] = piece
+        self.hash ^= ZOBRIST[piece][frm]
+
+    def winner(self):
+        if self.black_left <= 0:
+            return WHITE
+        elif self.white_left <= 0:
+            return BLACK
+
+        white_moves = move_cache.movable(self, WHITE)
+        black_moves = move_cache.movable(self, BLACK)
+
+        if white_moves == 0:
+            return BLACK
+        if black_moves == 0:
+            return WHITE
+
+        return None
+
+    def get_valid_moves(self, sq):
+        # Retorna {casa de destino: [casas capturadas]}. Com captura disponível,
+        # só as capturas, já resolvidas em cadeias (captura obrigatória)
+        captures = self._captures(sq)
+        if captures:
+            return self._capture_chains(sq, captures)
+        return self._simple_moves(sq)
+
+    def get_all_valid_moves(self, color):
+        all_moves = {}
+        for sq in self.get_all_pieces(color):
+            valid_moves = self.get_valid_moves(sq)
+            if valid_moves:
+                all_moves[sq] = valid_moves
+        return all_moves
+
+    def has_capture_moves(self, color):
+        for sq in self.get_all_pieces(color):
+            if self._captures(sq):
+                return True
+        return False
+
+    def _count_movable(self, color):
+        # Peças de color com alguma jogada (= len(get_all_valid_moves(color))):
+        # uma peça com captura sempre tem jogada, então não é preciso resolver cadeias
+        count = 0
+        for sq in self.get_all_pieces(color):
+            if self._has_simple_move(sq) or self._captures(sq):
+                count += 1
+        return count
+
+    def _simple_moves(self, sq):
+        squares = self.squares
+        piece = squares[sq]
+        moves = {}
+        if piece == KING or piece == -KING:
+            for ray in KING_RAYS[sq]:
+                for target in ray:
+                    if squares[target]:
+                        break
+                    moves[target] = []
+        else:
+            for direction in FORWARD_DIRECTIONS[piece]:
+                target = NEIGHBORS[sq][direction]
+                if target >= 0 and not squares[target]:
+                    moves[target] = []
+        return moves
+
+    def _has_simple_move(self, sq):
+        squares = self.squares
+        piece = squares[sq]
+        if piece == KING or piece == -KING:
+            for direction in range(len(DIRECTIONS)):
+                target = NEIGHBORS[sq][direction]
+                if target >= 0 and not squares[target]:
+                    return True
+        else:
+            for direction in FORWARD_DIRECTIONS[piece]:
+                target = NEIGHBORS[sq][direction]
+                if target >= 0 and not squares[target]:
+                    return True
+        return False
+
+    def _captures(self, sq):
+        # Capturas de um passo a partir de sq, na mesma ordem das regras
+        # originais; as peças comuns já encadeiam saltos para a frente aqui
+        squares = self.squares
+        piece = squares[sq]
+        white = piece > 0
+        moves = {}
+        if piece == KING or piece == -KING:
+            for direction, ray in enumerate(KING_RAYS[sq]):
+                for target in ray:
+                    current = squares[target]
+                    if current:
+                        if (current > 0) != white:
+                            landing = NEIGHBORS[target][direction]
+                            if landing >= 0 and not squares[landing]:
+                                moves[landing] = [target]
+                        break
+        else:
+            left, right = FORWARD_DIRECTIONS[piece]
+            self._forward_jumps(sq, left, left, right, white, None, moves)
+            self._forward_jumps(sq, right, left, right, white, None, moves)
+        return moves
+
+    def _forward_jumps(self, sq, direction, left, right, white, skipped, moves):
+        # Salto de uma peça comum na direção dada; depois de cada salto continua
+        # para a esquerda e a direita, levando só a última peça capturada
+        jumped = NEIGHBORS[sq][direction]
+        if jumped < 0:
+            return
+        current = self.squares[jumped]
+        if not current or (current > 0) == white:
+            return
+        landing = JUMPS[sq][direction]
+        if landing < 0 or self.squares[landing]:
+            return
+        moves[landing] = [jumped] + skipped if skipped else [jumped]
+        self._forward_jumps(landing, left, left, right, white, [jumped], moves)
+        self._forward_jumps(landing, right, left, right, white, [jumped], moves)
+
+    def _capture_chains(self, sq, captures):
+        # Busca em profundidade das capturas múltiplas: faz cada captura, procura
+        # novas capturas da casa de chegada (a peça pode ter sido promovida) e
+        # desfaz. Só os destinos finais de cada cadeia são retornados
+        final_moves = {}
+        for move, skipped in captures.items():
+            undo = self.make_move(sq, move, skipped)
+            more = self._captures(move)
+            if more:
+                more = self._capture_chains(move, more)
+            self.unmake_move(undo)
+
+            if more:
+                for new_move, new_skipped in more.items():
+                    final_moves[new_move] = skipped + new_skipped
+            else:
+                final_moves[move] = skipped
+        return final_moves
+
+def to_string(position):
+    # Uma linha por grupo de COLS casas, separadas por "/" (ex.: ".b.b.b/b.b.b./...")
+    chars = ''.join(PIECE_CHARS[piece] for piece in position.squares)
+    return '/'.join(chars[row * COLS:(row + 1) * COLS] for row in range(ROWS))
+
+def from_string(text):
+    rows = text.strip().split('/')
+    if len(rows) != ROWS or any(len(row) != COLS for row in rows):
+        raise ValueError(f"Esperadas {ROWS} linhas de {COLS} casas: {text!r}")
+
+    position = Position()
+    position.white_left = position.black_left = 0
+    for sq, char in enumerate(''.join(rows)):
+        if char not in CHAR_PIECES:
+            raise ValueError(f"Casa inválida {char!r} em {text!r}")
+        piece = CHAR_PIECES[char]
+        position.squares[sq] = piece
+        if piece > 0:
+            position.white_left += 1
+            position.white_kings += piece == WHITE * KING
+        elif piece < 0:
+            position.black_left += 1
+            position.black_kings += piece == BLACK * KING
+    position.hash = zobrist_hash(position.squares)
+    return position
+
+def generate_moves(position, color):
+    # Lista de jogadas (origem, destino, capturadas), sem passar pelo cache
+    moves = []
+    for sq in position.get_all_pieces(color):
+        for move, skipped in position.get_valid_moves(sq).items():
+            moves.append((sq, move, skipped))
+    return moves
+
+class MoveCache:
+    # Cache LRU, por posição (hash de Zobrist) e cor, do que a busca precisa da
+    # geração de jogadas: quantas peças têm jogada (usado por winner e evaluate)
+    # e a lista de jogadas (usada por minimax). Cada parte é calculada na
+    # primeira vez em que é pedida e reaproveitada por todos os outros usos
+    def __init__(self, capacity=1 << 16):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.entries.clear()
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.hits = self.misses = 0
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _entry(self, position, color):
+        key = position.hash ^ COLOR_KEYS[color]
+        entries = self.entries
+        entry = entries.get(key)
+        if entry is not None:
+            entries.move_to_end(key)
+            return entry
+        # [peças com jogada, jogadas]; cada campo é preenchido sob demanda
+        entry = entries[key] = [None, None]
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+        return entry
+
+    def movable(self, position, color):
+        entry = self._entry(position, color)
+        if entry[0] is not None:
+            self.hits += 1
+        elif entry[1] is not None:
+            # Contagem tirada da lista de jogadas já gerada
+            self.hits += 1
+            entry[0] = len({move[0] for move in entry[1]})
+        else:
+            self.misses += 1
+            entry[0] = position._count_movable(color)
+        return entry[0]
+
+    def moves(self, position, color):
+        # Tupla compartilhada entre os usos: quem for reordenar deve copiar
+        entry = self._entry(position, color)
+        if entry[1] is None:
+            self.misses += 1
+            entry[1] = tuple(generate_moves(position, color))
+        else:
+            self.hits += 1
+        return entry[1]
+
+# Chaves que separam as entradas de cada cor no cache
+COLOR_KEYS = {WHITE: 0, BLACK: ZOBRIST_BLACK_TO_MOVE}
+
+move_cache = MoveCache()
+
+def get_all_moves(position, color):
+    # Lista de jogadas (origem, destino, capturadas)
+    return list(move_cache.moves(position, color))
+
+def legal_moves(position, color):
+    # Mesmas jogadas que minimax considera: com captura disponível, só capturas
+    moves = generate_moves(position, color)
+    captures = [move for move in moves if move[2]]
+    return captures or moves
+
+class MoveOrdering:
+    # Heurísticas de ordenação que persistem durante uma busca: duas jogadas
+    # killer (jogadas sem captura que causaram corte) por profundidade restante
+    # e uma tabela de histórico indexada por (origem, destino)
+    def __init__(self):
+        self.killers = [[None, None] for _ in range(MAX_SEARCH_DEPTH + 1)]
+        self.history = [0] * (ROWS * COLS * ROWS * COLS)
+
+    def clear(self):
+        self.__init__()
+
+    def record_cutoff(self, move, depth):
+        frm, to, skipped = move
+        if skipped:
+            return
+        killers = self.killers[depth]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[frm * ROWS * COLS + to] += depth * depth
+
+# Prioridades de ordenação: jogada da tabela, capturas (pelo material ganho),
+# killers e, por fim, as demais pelo histórico
+TT_MOVE_PRIORITY = 4000000
+CAPTURE_PRIORITY = 3000000
+KILLER_PRIORITIES = (2000000, 1000000)
+
+def order_moves(position, moves, tt_move, depth, ordering):
+    # Ordenação estável: empates mantêm a ordem de geração
+    squares = position.squares
+    killers = ordering.killers[depth]
+    history = ordering.history
+
+    def priority(move):
+        if move == tt_move:
+            return TT_MOVE_PRIORITY
+        frm, to, skipped = move
+        if skipped:
+            # Peça comum vale 1 e dama 2 (o valor absoluto do código)
+            return CAPTURE_PRIORITY + 1000 * sum(abs(squares[sq]) for sq in skipped) + history[frm * ROWS * COLS + to]
+        if move == killers[0]:
+            return KILLER_PRIORITIES[0]
+        if move == killers[1]:
+            return KILLER_PRIORITIES[1]
+        return history[frm * ROWS * COLS + to]
+
+    moves.sort(key=priority, reverse=True)
+    return moves
+
+transposition_table = TranspositionTable()
+move_ordering = MoveOrdering()
+
+# Limite de nós de cada busca de quiescência (a partir de uma folha)
+QUIESCENCE_NODES = 200
+
+def _evaluate(position, stats):
+    if stats is None:
+        return position.evaluate()
+    start = stats.clock()
+    value = position.evaluate()
+    stats.evaluated(start)
+    return value
+
+def quiescence(position, alpha, beta, max_player, budget, deadline=None, stats=None):
+    # Continua além da profundidade nominal enquanto houver captura pendente
+    # (obrigatória, então não há "ficar parado"). budget é [nós restantes],
+    # compartilhado por toda a busca que começou na folha
+    if deadline is not None:
+        deadline.check()
+    if stats is not None:
+        stats.node(0)
+        start = stats.clock()
+    all_moves = move_cache.moves(position, WHITE if max_player else BLACK)
+    if stats is not None:
+        stats.generated(start)
+    capture_moves = [move for move in all_moves if move[2]]
+    if not capture_moves or budget[0] <= 0 or position.winner() is not None:
+        return _evaluate(position, stats)
+    budget[0] -= 1
+    if stats is not None:
+        stats.expanded += 1
+
+    # Capturas que ganham mais material primeiro
+    squares = position.squares
+    capture_moves.sort(key=lambda move: sum(abs(squares[sq]) for sq in move[2]), reverse=True)
+
+    if max_player:
+        best_eval = float('-inf')
+        for move in capture_moves:
+            undo = position.make_move(*move)
+            evaluation = quiescence(position, alpha, beta, False, budget, deadline, stats)
+            position.unmake_move(undo)
+            best_eval = max(best_eval, evaluation)
+            alpha = max(alpha, evaluation)
+            if beta <= alpha:
+                if stats is not None:
+                    stats.cutoff(0, move is capture_moves[0])
+                break
+    else:
+        best_eval = float('inf')
+        for move in capture_moves:
+            undo = position.make_move(*move)
+            evaluation = quiescence(position, alpha, beta, True, budget, deadline, stats)
+            position.unmake_move(undo)
+            best_eval = min(best_eval, evaluation)
+            beta = min(beta, evaluation)
+            if beta <= alpha:
+                if stats is not None:
+                    stats.cutoff(0, move is capture_moves[0])
+                break
+    return best_eval
+
+def minimax(position, depth, alpha, beta, max_player, deadline=None, first_move=None, stats=None,
+            table=transposition_table, ordering=move_ordering, quiescence_nodes=QUIESCENCE_NODES, tablebase=None,
+            root=True):
+    # Os filhos são visitados com make_move/unmake_move na própria posição.
+    # Com quiescence_nodes = 0 as folhas são avaliadas direto, sem quiescência.
+    # Com poucas peças, a tabela de finais (engine.tablebase) responde sem busca;
+    # a jogada dela só é procurada na raiz, já que nos nós internos (root=False)
+    # quem chama usa apenas a avaliação
+    if deadline is not None:
+        deadline.check()
+    if tablebase is not None and tablebase.covers(position):
+        color = WHITE if max_player else BLACK
+        score = tablebase.score(position, color)
+        if score is not None:
+            if stats is not None:
+                stats.node(depth)
+            return score, tablebase.best_move(position, color) if root else None
+    if depth == 0 and quiescence_nodes:
+        return quiescence(position, alpha, beta, max_player, [quiescence_nodes], deadline, stats), None
+    if stats is not None:
+        stats.node(depth)
+    if depth == 0:
+        return _evaluate(position, stats), None
+    # As jogadas de quem joga são geradas uma vez, pelo cache, e servem também
+    # para winner() e evaluate() contarem as peças com jogada
+    if stats is not None:
+        start = stats.clock()
+    all_moves = move_cache.moves(position, WHITE if max_player else BLACK)
+    if stats is not None:
+        stats.generated(start)
+    if position.winner() is not None:
+        return _evaluate(position, stats), None
+
+    # Consulta à tabela de transposição, respeitando a janela alfa-beta atual
+    key = position.hash if max_player else position.hash ^ ZOBRIST_BLACK_TO_MOVE
+    tt_move = first_move
+    entry = table.probe(key)
+    if stats is not None:
+        stats.tt_probe(entry is not None)
+    if entry is not None:
+        _, entry_depth, flag, entry_score, entry_move, _ = entry
+        if entry_depth >= depth:
+            if flag == EXACT:
+                return entry_score, entry_move
+            elif flag == LOWER_BOUND:
+                alpha = max(alpha, entry_score)
+            else:
+                beta = min(beta, entry_score)
+            if alpha >= beta:
+                return entry_score, entry_move
+        if tt_move is None:
+            tt_move = entry_move
+    alpha_start, beta_start = alpha, beta
+    if stats is not None:
+        stats.expanded += 1
+
+    # Prioriza movimentos de captura. Uma peça com captura só gera capturas,
+    # então basta olhar as casas capturadas de cada jogada
+    capture_moves = [move for move in all_moves if move[2]]
+    all_moves = capture_moves if capture_moves else list(all_moves)
+    order_moves(position, all_moves, tt_move, depth, ordering)
+
+    best_move = None
+    if max_player:
+        best_eval = float('-inf')
+        for move in all_moves:
+            undo = position.make_move(*move)
+            evaluation = minimax(position, depth - 1, alpha, beta, False, deadline, None, stats, table, ordering,
+                                 quiescence_nodes, tablebase, False)[0]
+            position.unmake_move(undo)
+            if evaluation > best_eval:
+                best_eval = evaluation
+                best_move = move
+                if stats is not None:
+                    stats.update_pv(depth, move)
+            alpha = max(alpha, evaluation)
+            if beta <= alpha:
+                if stats is not None:
+                    stats.cutoff(depth, move is all_moves[0])
+                ordering.record_cutoff(move, depth)
+                break
+    else:
+        best_eval = float('inf')
+        for move in all_moves:
+            undo = position.make_move(*move)
+            evaluation = minimax(position, depth - 1, alpha, beta, True, deadline, None, stats, table, ordering,
+                                 quiescence_nodes, tablebase, False)[0]
+            position.unmake_move(undo)
+            if evaluation < best_eval:
+                best_eval = evaluation
+                best_move = move
+                if stats is not None:
+                    stats.update_pv(depth, move)
+            beta = min(beta, evaluation)
+            if beta <= alpha:
+                if stats is not None:
+                    stats.cutoff(depth, move is all_moves[0])
+                ordering.record_cutoff(move, depth)
+                break
+
+    if best_eval <= alpha_start:
+        flag = UPPER_BOUND
+    elif best_eval >= beta_start:
+        flag = LOWER_BOUND
+    else:
+        flag = EXACT
+    table.store(key, depth, flag, best_eval, best_move)
+    return best_eval, best_move
+
+def search(position, time_budget_ms, max_player=False, table=transposition_table, ordering=move_ordering,
+           tablebase=None, stats=None, cancel=None, pondered=None):
+    # Aprofundamento iterativo sobre uma cópia da posição, já que uma busca
+    # interrompida deixa jogadas sem desfazer. A melhor jogada da profundidade
+    # anterior é buscada primeiro na raiz. Retorna (jogada, avaliação, profundidade).
+    # pondered é a entrada de ponder para esta posição, se houver; nesse caso
+    # as killers e o histórico do ponder são mantidos
+    position = position.copy()
+    table.new_search()
+    if pondered is None:
+        ordering.clear()
+
+    def search_depth(depth, best_move, deadline):
+        evaluation, move = minimax(position, depth, float('-inf'), float('inf'), max_player, deadline, best_move, stats, table,
+                                   ordering, tablebase=tablebase)
+        if stats is not None:
+            stats.complete_depth(depth, move, evaluation)
+        return move, evaluation
+
+    return iterative_deepening(search_depth, time_budget_ms, MAX_SEARCH_DEPTH, cancel, pondered)
+
+def ponder(position, results, max_player=False, table=transposition_table, ordering=move_ordering, tablebase=None,
+           cancel=None):
+    # Busca, enquanto o adversário pensa, a resposta a cada jogada dele em
+    # position (max_player é o lado da IA, como em search). results[hash da
+    # posição resultante] recebe o que search(..., pondered=) aproveita quando
+    # ele jogar. A jogada que a tabela prevê para ele vem primeiro
+    table.new_search()
+    ordering.clear()
+    opponent_max = not max_player
+    key = position.hash if opponent_max else position.hash ^ ZOBRIST_BLACK_TO_MOVE
+    entry = table.probe(key)
+    predicted = entry[4] if entry is not None else None
+    moves = sorted(legal_moves(position, WHITE if opponent_max else BLACK), key=lambda move: move != predicted)
+    searches = []
+    for move in moves:
+        child = position.copy()
+        child.make_move(*move)
+        if child.winner() is not None:
+            continue
+
+        def search_depth(depth, best_move, deadline, child=child):
+            evaluation, move = minimax(child, depth, float('-inf'), float('inf'), max_player, deadline, best_move, None, table,
+                                       ordering, tablebase=tablebase)
+            return move, evaluation
+
+        searches.append((child.hash, search_depth))
+    return pondering(searches, MAX_SEARCH_DEPTH, results, cancel)
@@ -0,0 +1,531 @@
+import math
+import random
+import time
+
+from engine.search import Deadline, SearchTimeout, iterative_deepening, pondering
+from engine.transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+ROW_COUNT = 6
+COLUMN_COUNT = 7
+
+EMPTY = 0
+PLAYER_PIECE = 1
+AI_PIECE = 2
+
+WINDOW_LENGTH = 4
+
+# Representação em bitboard: cada coluna ocupa ROW_COUNT + 1 bits (o bit extra
+# fica sempre vazio e impede que os deslocamentos "vazem" para a coluna vizinha).
+# O bit da casa (row, col) é col * COLUMN_HEIGHT + row.
+COLUMN_HEIGHT = ROW_COUNT + 1
+TOP_BITS = [c * COLUMN_HEIGHT + ROW_COUNT for c in range(COLUMN_COUNT)]
+CENTER_MASK = ((1 << ROW_COUNT) - 1) << (COLUMN_COUNT // 2 * COLUMN_HEIGHT)
+
+# Ordem de busca: colunas centrais primeiro melhoram muito os cortes alfa-beta
+SEARCH_ORDER = sorted(range(COLUMN_COUNT), key=lambda c: abs(COLUMN_COUNT // 2 - c))
+# Mesma ordem, mas começando pela coluna sugerida pela tabela de transposição
+ORDER_FROM = [[col] + [c for c in SEARCH_ORDER if c != col] for col in range(COLUMN_COUNT)]
+
+# Chaves de Zobrist (semente fixa para que os hashes sejam estáveis entre execuções)
+_zobrist_random = random.Random(20240601)
+ZOBRIST = [[_zobrist_random.getrandbits(64) for _ in range(COLUMN_COUNT * COLUMN_HEIGHT)] for _ in range(3)]
+# Chave extra para diferenciar quem joga (nó de maximização ou minimização)
+ZOBRIST_MIN_PLAYER = _zobrist_random.getrandbits(64)
+
+def cell_bit(row, col):
+    return 1 << (col * COLUMN_HEIGHT + row)
+
+# Janelas de 4 casas (listas de índices de bit) e as janelas que passam por cada
+# casa, para a avaliação incremental. Direções: horizontal, vertical, diagonal
+# positiva e diagonal negativa, as mesmas de score_position
+WINDOWS = [
+    [(c + i * dc) * COLUMN_HEIGHT + r + i * dr for i in range(4)]
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1))
+    for r in range(ROW_COUNT)
+    for c in range(COLUMN_COUNT)
+    if 0 <= r + 3 * dr < ROW_COUNT and c + 3 * dc < COLUMN_COUNT
+]
+WINDOWS_THROUGH = [[w for w, cells in enumerate(WINDOWS) if index in cells] for index in range(COLUMN_COUNT * COLUMN_HEIGHT)]
+
+class Position:
+    __slots__ = ("bitboards", "heights", "moves", "hash", "windows", "score")
+
+    def __init__(self):
+        # Uma máscara por peça, indexada por EMPTY/PLAYER_PIECE/AI_PIECE
+        self.bitboards = [0, 0, 0]
+        # Próximo bit livre de cada coluna
+        self.heights = [c * COLUMN_HEIGHT for c in range(COLUMN_COUNT)]
+        self.moves = 0
+        # Hash de Zobrist atualizado incrementalmente a cada jogada
+        self.hash = 0
+        # Código (peças da IA + WINDOW_CODE_STEP * peças do jogador) de cada
+        # janela de 4 casas, e score_position(board, AI_PIECE) mantido a cada jogada
+        self.windows = [0] * len(WINDOWS)
+        self.score = 0
+
+    def copy(self):
+        position = Position.__new__(Position)
+        position.bitboards = self.bitboards[:]
+        position.heights = self.heights[:]
+        position.moves = self.moves
+        position.hash = self.hash
+        position.windows = self.windows[:]
+        position.score = self.score
+        return position
+
+    def can_play(self, col):
+        return self.heights[col] < TOP_BITS[col]
+
+    def make_move(self, col, piece):
+        index = self.heights[col]
+        self.bitboards[piece] |= 1 << index
+        self.hash ^= ZOBRIST[piece][index]
+        self.heights[col] = index + 1
+        self.moves += 1
+        # Só as janelas que passam pela casa jogada mudam de pontuação
+        windows = self.windows
+        step = WINDOW_STEPS[piece]
+        delta = WINDOW_DELTAS[piece]
+        score = self.score + CENTER_SCORES[piece][index]
+        for window in WINDOWS_THROUGH[index]:
+            code = windows[window]
+            score += delta[code]
+            windows[window] = code + step
+        self.score = score
+
+    def unmake_move(self, col):
+        index = self.heights[col] - 1
+        bit = 1 << index
+        piece = PLAYER_PIECE if self.bitboards[PLAYER_PIECE] & bit else AI_PIECE
+        self.bitboards[piece] ^= bit
+        self.hash ^= ZOBRIST[piece][index]
+        self.heights[col] = index
+        self.moves -= 1
+        windows = self.windows
+        step = WINDOW_STEPS[piece]
+        delta = WINDOW_DELTAS[piece]
+        score = self.score - CENTER_SCORES[piece][index]
+        for window in WINDOWS_THROUGH[index]:
+            code = windows[window] - step
+            score -= delta[code]
+            windows[window] = code
+        self.score = score
+
+    def get_piece(self, row, col):
+        bit = cell_bit(row, col)
+        if self.bitboards[PLAYER_PIECE] & bit:
+            return PLAYER_PIECE
+        if self.bitboards[AI_PIECE] & bit:
+            return AI_PIECE
+        return EMPTY
+
+transposition_table = TranspositionTable()
+
+def create_board():
+    return Position()
+
+def from_moves(moves):
+    # Posição a partir das colunas jogadas, numeradas a partir de 1 (ex.: "4453").
+    # As peças alternam de modo que quem joga a seguir seja a IA (AI_PIECE)
+    board = create_board()
+    for i, char in enumerate(moves):
+        col = ord(char) - ord('1')
+        if not 0 <= col < COLUMN_COUNT or not board.can_play(col) or is_terminal_node(board):
+            raise ValueError(f"Jogada inválida na posição {i}: {char!r}")
+        board.make_move(col, PLAYER_PIECE if (len(moves) - i) % 2 else AI_PIECE)
+    return board
+
+def drop_piece(board, row, col, piece):
+    # A linha é sempre a próxima livre da coluna; mantida na assinatura por compatibilidade
+    board.make_move(col, piece)
+
+def is_valid_location(board, col):
+    return board.heights[col] < TOP_BITS[col]
+
+def get_next_open_row(board, col):
+    if board.heights[col] < TOP_BITS[col]:
+        return board.heights[col] - col * COLUMN_HEIGHT
+
+def winning_move(board, piece):
+    bitboard = board.bitboards[piece]
+    # Vertical (1), horizontal (COLUMN_HEIGHT) e as duas diagonais
+    for shift in (1, COLUMN_HEIGHT, COLUMN_HEIGHT - 1, COLUMN_HEIGHT + 1):
+        pairs = bitboard & (bitboard >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+def evaluate_window(window, piece):
+    score = 0
+    opponent_piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+
+    if window.count(piece) == 4:
+        score += 100
+    elif window.count(piece) == 3 and window.count(EMPTY) == 1:
+        score += 5
+    elif window.count(piece) == 2 and window.count(EMPTY) == 2:
+        score += 2
+
+    if window.count(opponent_piece) == 3 and window.count(EMPTY) == 1:
+        score -= 4
+
+    return score
+
+def _window_starts(dr, dc):
+    # Bits das casas onde começa uma janela de 4 casas inteira dentro do tabuleiro
+    starts = 0
+    for r in range(ROW_COUNT):
+        for c in range(COLUMN_COUNT):
+            if 0 <= r + 3 * dr < ROW_COUNT and c + 3 * dc < COLUMN_COUNT:
+                starts |= cell_bit(r, c)
+    return starts
+
+# (deslocamento entre casas consecutivas, inícios válidos) para horizontal,
+# vertical, diagonal positiva e diagonal negativa
+WINDOW_DIRECTIONS = [
+    (dc * COLUMN_HEIGHT + dr, _window_starts(dr, dc))
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1))
+]
+
+def _score_of(own, opp):
+    return evaluate_window([AI_PIECE] * own + [PLAYER_PIECE] * opp + [EMPTY] * (WINDOW_LENGTH - own - opp), AI_PIECE)
+
+# Código de uma janela = peças da IA + WINDOW_CODE_STEP * peças do jogador;
+# WINDOW_DELTAS[peça][código] é quanto a pontuação da janela (de evaluate_window,
+# do ponto de vista da IA) muda quando essa peça entra numa janela com esse código
+WINDOW_CODE_STEP = WINDOW_LENGTH + 1
+WINDOW_STEPS = [0, WINDOW_CODE_STEP, 1]
+_window_scores = [
+    _score_of(code % WINDOW_CODE_STEP, code // WINDOW_CODE_STEP) if code % WINDOW_CODE_STEP + code // WINDOW_CODE_STEP <= WINDOW_LENGTH else 0
+    for code in range(WINDOW_CODE_STEP * WINDOW_CODE_STEP)
+]
+WINDOW_DELTAS = [
+    [_window_scores[code + step] - _window_scores[code] if code + step < len(_window_scores) else 0 for code in range(len(_window_scores))]
+    for step in WINDOW_STEPS
+]
+# Pontos de centro da IA por casa
+CENTER_SCORES = [[3 if piece == AI_PIECE and CENTER_MASK >> index & 1 else 0 for index in range(COLUMN_COUNT * COLUMN_HEIGHT)] for piece in range(3)]
+
+# Pesos derivados de evaluate_window para manter exatamente a mesma pontuação
+FOUR_SCORE = _score_of(4, 0)
+THREE_SCORE = _score_of(3, 0)
+TWO_SCORE = _score_of(2, 0)
+OPPONENT_THREE_SCORE = _score_of(0, 3)
+
+def window_counts(bitboard, shift):
+    # Soma bit a bit das 4 casas de cada janela: o bit de início de cada janela
+    # indica se ela tem 4, exatamente 3 ou exatamente 2 peças, ou alguma peça
+    a = bitboard
+    b = bitboard >> shift
+    c = bitboard >> (2 * shift)
+    d = bitboard >> (3 * shift)
+    ab_and, ab_or = a & b, a | b
+    cd_and, cd_or = c & d, c | d
+    four = ab_and & cd_and
+    at_least_three = (ab_and & cd_or) | (cd_and & ab_or)
+    two = (ab_and | cd_and | (ab_or & cd_or)) & ~at_least_three
+    return four, at_least_three & ~four, two, ab_or | cd_or
+
+def score_position(board, piece):
+    own = board.bitboards[piece]
+    opponent = board.bitboards[PLAYER_PIECE if piece == AI_PIECE else AI_PIECE]
+
+    # Pontuar centro
+    score = (own & CENTER_MASK).bit_count() * 3
+
+    # Pontuar as janelas de todas as direções de uma vez, contando bits
+    for shift, starts in WINDOW_DIRECTIONS:
+        own_four, own_three, own_two, own_any = window_counts(own, shift)
+        _, opp_three, _, opp_any = window_counts(opponent, shift)
+        own_only = starts & ~opp_any
+        score += FOUR_SCORE * (own_four & starts).bit_count()
+        score += THREE_SCORE * (own_three & own_only).bit_count()
+        score += TWO_SCORE * (own_two & own_only).bit_count()
+        score += OPPONENT_THREE_SCORE * (opp_three & starts & ~own_any).bit_count()
+
+    return score
+
+def is_terminal_node(board):
+    return winning_move(board, PLAYER_PIECE) or winning_move(board, AI_PIECE) or board.moves == ROW_COUNT * COLUMN_COUNT
+
+def minimax(board, depth, alpha, beta, maximizingPlayer, table=transposition_table, deadline=None, stats=None):
+    if deadline is not None:
+        deadline.check()
+    if stats is not None:
+        stats.node(depth)
+        start = stats.clock()
+    is_terminal = is_terminal_node(board)
+    
+    if depth == 0 or is_terminal:
+        # A avaliação de uma folha inclui a detecção de fim de jogo
+        if is_terminal:
+            if winning_move(board, AI_PIECE):
+                result = (None, 100000000000000)
+            elif winning_move(board, PLAYER_PIECE):
+                result = (None, -10000000000000)
+            else:  # Jogo terminou em empate
+                result = (None, 0)
+        else:  # Profundidade é zero
+            # Igual a score_position(board, AI_PIECE), mantida por make_move/unmake_move
+            result = (None, board.score)
+        if stats is not None:
+            stats.evaluated(start)
+        return result
+
+    # Consulta à tabela de transposição, respeitando a janela alfa-beta atual.
+    # Ela dá a ordem das colunas, então conta, junto com a lista de colunas
+    # jogáveis, como a geração de jogadas nas estatísticas
+    if stats is not None:
+        start = stats.clock()
+    key = board.hash if maximizingPlayer else board.hash ^ ZOBRIST_MIN_PLAYER
+    order = SEARCH_ORDER
+    entry = table.probe(key)
+    if stats is not None:
+        stats.tt_probe(entry is not None)
+    if entry is not None:
+        _, entry_depth, flag, entry_score, entry_column, _ = entry
+        if entry_depth >= depth:
+            if flag == EXACT:
+                return entry_column, entry_score
+            elif flag == LOWER_BOUND:
+                alpha = max(alpha, entry_score)
+            else:
+                beta = min(beta, entry_score)
+            if alpha >= beta:
+                return entry_column, entry_score
+        order = ORDER_FROM[entry_column]
+    columns = [col for col in order if board.can_play(col)]
+    alpha_start, beta_start = alpha, beta
+    if stats is not None:
+        stats.generated(start)
+        stats.expanded += 1
+    
+    # As jogadas são feitas e desfeitas na mesma posição, sem cópias
+    if maximizingPlayer:
+        value = -math.inf
+        column = None
+        for col in columns:
+            board.make_move(col, AI_PIECE)
+            new_score = minimax(board, depth-1, alpha, beta, False, table, deadline, stats)[1]
+            board.unmake_move(col)
+            if new_score > value:
+                value = new_score
+                column = col
+                if stats is not None:
+                    stats.update_pv(depth, col)
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoff(depth, col == columns[0])
+                break
+    
+    else:  # Minimizando jogador
+        value = math.inf
+        column = None
+        for col in columns:
+            board.make_move(col, PLAYER_PIECE)
+            new_score = minimax(board, depth-1, alpha, beta, True, table, deadline, stats)[1]
+            board.unmake_move(col)
+            if new_score < value:
+                value = new_score
+                column = col
+                if stats is not None:
+                    stats.update_pv(depth, col)
+            beta = min(beta, value)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoff(depth, col == columns[0])
+                break
+
+    if value <= alpha_start:
+        flag = UPPER_BOUND
+    elif value >= beta_start:
+        flag = LOWER_BOUND
+    else:
+        flag = EXACT
+    table.store(key, depth, flag, value, column)
+    return column, value
+
+# Bounds vistos pelo outro lado: um limite inferior para a IA é superior para o jogador
+FLIPPED_FLAG = {EXACT: EXACT, LOWER_BOUND: UPPER_BOUND, UPPER_BOUND: LOWER_BOUND}
+
+# Fração do tempo da jogada dada ao solucionador exato em search(..., solver=);
+# se ele não terminar, a busca heurística usa o resto
+SOLVER_SHARE = 0.5
+
+# Meia largura da janela de aspiração em torno da pontuação da profundidade anterior
+ASPIRATION_WINDOW = 8
+
+def pvs(board, depth, alpha, beta, maximizingPlayer, table=transposition_table, deadline=None, stats=None):
+    # Principal variation search (negascout): mesmo resultado de minimax na
+    # mesma profundidade e com a mesma interface, mas só a primeira coluna de
+    # cada nó é buscada com a janela inteira; as demais, com janela nula, só
+    # para provar que não a superam, e são rebuscadas quando superam
+    if maximizingPlayer:
+        return _negascout(board, depth, alpha, beta, 1, table, deadline, stats)
+    column, value = _negascout(board, depth, -beta, -alpha, -1, table, deadline, stats)
+    return column, -value
+
+def _negascout(board, depth, alpha, beta, color, table, deadline, stats):
+    # Negamax: a pontuação é do ponto de vista de quem joga (color 1 para a IA,
+    # -1 para o jogador). A tabela de transposição guarda pontuações e limites
+    # do ponto de vista da IA, como minimax, para que as duas buscas a compartilhem
+    if deadline is not None:
+        deadline.check()
+    if stats is not None:
+        stats.node(depth)
+        start = stats.clock()
+    is_terminal = is_terminal_node(board)
+
+    if depth == 0 or is_terminal:
+        if is_terminal:
+            if winning_move(board, AI_PIECE):
+                value = 100000000000000
+            elif winning_move(board, PLAYER_PIECE):
+                value = -10000000000000
+            else:
+                value = 0
+        else:
+            value = board.score
+        if stats is not None:
+            stats.evaluated(start)
+        return None, color * value
+
+    if stats is not None:
+        start = stats.clock()
+    key = board.hash if color == 1 else board.hash ^ ZOBRIST_MIN_PLAYER
+    order = SEARCH_ORDER
+    entry = table.probe(key)
+    if stats is not None:
+        stats.tt_probe(entry is not None)
+    if entry is not None:
+        _, entry_depth, flag, entry_score, entry_column, _ = entry
+        if entry_depth >= depth:
+            entry_score *= color
+            if color == -1:
+                flag = FLIPPED_FLAG[flag]
+            if flag == EXACT:
+                return entry_column, entry_score
+            elif flag == LOWER_BOUND:
+                alpha = max(alpha, entry_score)
+            else:
+                beta = min(beta, entry_score)
+            if alpha >= beta:
+                return entry_column, entry_score
+        order = ORDER_FROM[entry_column]
+    columns = [col for col in order if board.can_play(col)]
+    alpha_start = alpha
+    if stats is not None:
+        stats.generated(start)
+        stats.expanded += 1
+
+    piece = AI_PIECE if color == 1 else PLAYER_PIECE
+    value = -math.inf
+    column = None
+    for col in columns:
+        board.make_move(col, piece)
+        if column is None:
+            score = -_negascout(board, depth - 1, -beta, -alpha, -color, table, deadline, stats)[1]
+        else:
+            # Janela nula: basta saber se a coluna supera alpha
+            score = -_negascout(board, depth - 1, -alpha - 1, -alpha, -color, table, deadline, stats)[1]
+            if alpha < score < beta:
+                score = -_negascout(board, depth - 1, -beta, -score, -color, table, deadline, stats)[1]
+        board.unmake_move(col)
+        if score > value:
+            value = score
+            column = col
+            if stats is not None:
+                stats.update_pv(depth, col)
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            if stats is not None:
+                stats.cutoff(depth, col == columns[0])
+            break
+
+    if value <= alpha_start:
+        flag = UPPER_BOUND
+    elif value >= beta:
+        flag = LOWER_BOUND
+    else:
+        flag = EXACT
+    if color == -1:
+        flag = FLIPPED_FLAG[flag]
+    table.store(key, depth, flag, color * value, column)
+    return column, value
+
+def aspiration_search(board, depth, guess, table=transposition_table, deadline=None, stats=None):
+    # pvs na raiz com uma janela estreita em torno de guess (a pontuação da
+    # profundidade anterior); se o valor cair fora dela, rebusca com a janela
+    # inteira, já com a tabela preenchida pela primeira tentativa
+    if guess is None:
+        return pvs(board, depth, -math.inf, math.inf, True, table, deadline, stats)
+    alpha, beta = guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW
+    column, score = pvs(board, depth, alpha, beta, True, table, deadline, stats)
+    if score <= alpha or score >= beta:
+        column, score = pvs(board, depth, -math.inf, math.inf, True, table, deadline, stats)
+    return column, score
+
+def search(board, time_budget_ms, table=transposition_table, book=None, stats=None, cancel=None, pondered=None,
+           solver=None):
+    # Aprofundamento iterativo: a busca é interrompida no meio de make/unmake
+    # quando o tempo acaba, por isso trabalha sobre uma cópia da posição.
+    # Posições do livro de aberturas (engine.opening_book) não são buscadas.
+    # pondered é a entrada de ponder para esta posição, se houver. Com solver
+    # (engine.solver.Solver), tenta primeiro o valor exato em parte do tempo;
+    # resolvida, a posição vale como as folhas terminais de minimax e a
+    # profundidade é a do fim do tabuleiro
+    if book is not None:
+        entry = book.probe(board)
+        if entry is not None:
+            return entry[0], entry[1], book.depth
+    if solver is not None:
+        start = time.perf_counter()
+        try:
+            column, score = solver.best_move(board, AI_PIECE, deadline=Deadline(time_budget_ms * SOLVER_SHARE, cancel))
+        except SearchTimeout:
+            time_budget_ms -= (time.perf_counter() - start) * 1000
+        else:
+            value = 100000000000000 if score > 0 else -10000000000000 if score < 0 else 0
+            return column, value, ROW_COUNT * COLUMN_COUNT - board.moves
+    position = board.copy()
+    table.new_search()
+    # Pontuação da profundidade anterior, centro da janela de aspiração
+    guess = [pondered[1] if pondered is not None else None]
+
+    def search_depth(depth, best_column, deadline):
+        # A melhor coluna da profundidade anterior fica na tabela de
+        # transposição e é buscada primeiro na raiz
+        column, score = aspiration_search(position, depth, guess[0], table, deadline, stats)
+        guess[0] = score
+        if stats is not None:
+            stats.complete_depth(depth, column, score)
+        return column, score
+
+    return iterative_deepening(search_depth, time_budget_ms, ROW_COUNT * COLUMN_COUNT - board.moves, cancel, pondered)
+
+def ponder(board, results, table=transposition_table, cancel=None):
+    # Busca, enquanto o jogador pensa, a resposta da IA a cada coluna que ele
+    # pode jogar em board. results[hash da posição resultante] recebe o que
+    # search(..., pondered=) aproveita quando o jogador jogar. A coluna que a
+    # tabela prevê para o jogador (a da última busca da IA) vem primeiro
+    table.new_search()
+    entry = table.probe(board.hash ^ ZOBRIST_MIN_PLAYER)
+    order = ORDER_FROM[entry[4]] if entry is not None and entry[4] is not None else SEARCH_ORDER
+    searches = []
+    for col in order:
+        if not board.can_play(col):
+            continue
+        position = board.copy()
+        position.make_move(col, PLAYER_PIECE)
+        if is_terminal_node(position):
+            continue
+
+        def search_depth(depth, best_column, deadline, position=position):
+            return pvs(position, depth, -math.inf, math.inf, True, table, deadline)
+
+        searches.append((position.hash, search_depth))
+    return pondering(searches, ROW_COUNT * COLUMN_COUNT - board.moves - 1, results, cancel)
+
+def get_valid_locations(board):
+    return [col for col in range(COLUMN_COUNT) if board.heights[col] < TOP_BITS[col]]
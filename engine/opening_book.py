@@ -0,0 +1,161 @@
+import argparse
+import math
+import mmap
+import struct
+import sys
+import time
+from array import array
+
+from engine.connect_four import (
+    AI_PIECE, COLUMN_COUNT, COLUMN_HEIGHT, PLAYER_PIECE, ROW_COUNT, SEARCH_ORDER, ZOBRIST,
+    create_board, is_terminal_node, minimax,
+)
+from engine.transposition import TranspositionTable
+
+# Livro de aberturas do Connect Four: para cada posição do início da partida em
+# que a IA joga, a coluna e a pontuação de uma busca profunda feita offline.
+# As posições são identificadas pelo hash de Zobrist (Position.hash) reduzido
+# pela simetria do espelho: só o menor entre o hash e o do tabuleiro espelhado
+# é guardado, e a coluna é espelhada de volta na consulta.
+#
+# Arquivo: cabeçalho, chaves ordenadas (Q), colunas (b) e pontuações (q), para
+# busca binária direto no mmap
+MAGIC = b"C4OB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHI")
+KEY = struct.Struct("<Q")
+COLUMN = struct.Struct("<b")
+SCORE = struct.Struct("<q")
+
+DEFAULT_PLIES = 6
+DEFAULT_DEPTH = 12
+
+# Bit espelhado de cada bit do bitboard (coluna c vira COLUMN_COUNT - 1 - c)
+MIRROR_INDEX = [
+    (COLUMN_COUNT - 1 - index // COLUMN_HEIGHT) * COLUMN_HEIGHT + index % COLUMN_HEIGHT
+    for index in range(COLUMN_COUNT * COLUMN_HEIGHT)
+]
+
+def mirror_hash(board):
+    key = 0
+    for piece in (PLAYER_PIECE, AI_PIECE):
+        bitboard = board.bitboards[piece]
+        while bitboard:
+            low = bitboard & -bitboard
+            key ^= ZOBRIST[piece][MIRROR_INDEX[low.bit_length() - 1]]
+            bitboard ^= low
+    return key
+
+def book_key(board):
+    # Retorna (chave canônica, se a posição foi espelhada)
+    mirrored = mirror_hash(board)
+    if mirrored < board.hash:
+        return mirrored, True
+    return board.hash, False
+
+def deep_search(board, depth):
+    # Aprofundamento iterativo sem limite de tempo: as profundidades menores
+    # deixam na tabela a ordem das colunas para as maiores. Cada posição tem
+    # tabela própria, para que o resultado não dependa da ordem de construção
+    table = TranspositionTable()
+    for current in range(1, depth + 1):
+        column, score = minimax(board, current, -math.inf, math.inf, True, table)
+    return column, score
+
+def build_book(plies=DEFAULT_PLIES, depth=DEFAULT_DEPTH, verbose=False):
+    # Posições com menos de plies peças em que a IA joga, começando ela ou o
+    # jogador. Nas posições da IA só a coluna do livro é seguida (é a que ela
+    # vai jogar); nas do jogador, todas as respostas. Retorna {chave: (coluna, pontuação)}
+    book = {}
+    board = create_board()
+    start = time.perf_counter()
+
+    def visit(ai_to_move):
+        if board.moves >= plies or is_terminal_node(board):
+            return
+        if not ai_to_move:
+            for col in SEARCH_ORDER:
+                if board.can_play(col):
+                    board.make_move(col, PLAYER_PIECE)
+                    visit(True)
+                    board.unmake_move(col)
+            return
+        key, mirrored = book_key(board)
+        entry = book.get(key)
+        if entry is None:
+            column, score = deep_search(board, depth)
+            book[key] = entry = (COLUMN_COUNT - 1 - column if mirrored else column, score)
+            if verbose and len(book) % 50 == 0:
+                print(f"{len(book)} posições ({time.perf_counter() - start:.0f}s)", flush=True)
+        column = COLUMN_COUNT - 1 - entry[0] if mirrored else entry[0]
+        board.make_move(column, AI_PIECE)
+        visit(False)
+        board.unmake_move(column)
+
+    visit(True)
+    visit(False)
+    return book
+
+def save_book(book, path, plies, depth):
+    keys = sorted(book)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, plies, depth, len(keys)))
+        array('Q', keys).tofile(f)
+        array('b', [book[key][0] for key in keys]).tofile(f)
+        array('q', [book[key][1] for key in keys]).tofile(f)
+
+class OpeningBook:
+    # Leitura por mmap com busca binária nas chaves, sem carregar o arquivo
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.plies, self.depth, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} não é um livro de aberturas do Connect Four")
+        self.keys_offset = HEADER.size
+        self.columns_offset = self.keys_offset + KEY.size * self.count
+        self.scores_offset = self.columns_offset + COLUMN.size * self.count
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def probe(self, board):
+        # (coluna, pontuação do ponto de vista da IA) ou None fora do livro
+        if board.moves >= self.plies:
+            return None
+        key, mirrored = book_key(board)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if KEY.unpack_from(self.data, self.keys_offset + KEY.size * middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count or KEY.unpack_from(self.data, self.keys_offset + KEY.size * low)[0] != key:
+            return None
+        column = COLUMN.unpack_from(self.data, self.columns_offset + COLUMN.size * low)[0]
+        score = SCORE.unpack_from(self.data, self.scores_offset + SCORE.size * low)[0]
+        if mirrored:
+            column = COLUMN_COUNT - 1 - column
+        return column, score
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Constrói o livro de aberturas do Connect Four.")
+    parser.add_argument("output", help="arquivo do livro")
+    parser.add_argument("--plies", type=int, default=DEFAULT_PLIES, help="posições com menos peças que isso entram no livro")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="profundidade da busca de cada posição")
+    args = parser.parse_args(argv)
+    if not 0 < args.plies <= ROW_COUNT * COLUMN_COUNT:
+        parser.error("--plies fora do tabuleiro")
+    start = time.perf_counter()
+    book = build_book(args.plies, args.depth, verbose=True)
+    save_book(book, args.output, args.plies, args.depth)
+    print(f"{len(book)} posições gravadas em {args.output} ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import math
+import os
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from multiprocessing import Array
+
+from engine import connect_four
+from engine.connect_four import AI_PIECE, ORDER_FROM, SEARCH_ORDER
+from engine.search import Deadline, iterative_deepening
+from engine.stats import SearchStats
+from engine.transposition import TranspositionTable
+
+# Estado de cada processo de trabalho. _shared guarda (id da busca, alfa): o
+# melhor valor exato já encontrado na raiz, publicado para os outros processos
+_shared = None
+_table = None
+_last_search = None
+
+def _init_worker(shared):
+    global _shared, _table
+    _shared = shared
+    # Cada processo tem a sua tabela, que persiste entre as tarefas da mesma busca
+    _table = TranspositionTable()
+
+def _shared_alpha(search_id, alpha):
+    with _shared.get_lock():
+        if _shared[0] == search_id:
+            return max(alpha, _shared[1])
+    return alpha
+
+def _publish_alpha(search_id, score):
+    with _shared.get_lock():
+        if _shared[0] == search_id and score > _shared[1]:
+            _shared[1] = score
+
+def _search_column(board, col, depth, alpha, beta, search_id, time_budget_ms):
+    # Busca um filho da raiz. O alfa usado é o maior entre o recebido e o
+    # publicado pelos outros processos até o momento em que a tarefa começa
+    global _last_search
+    if search_id != _last_search:
+        _table.new_search()
+        _last_search = search_id
+    alpha = _shared_alpha(search_id, alpha)
+    deadline = Deadline(time_budget_ms) if time_budget_ms is not None else None
+    stats = SearchStats()
+    board.make_move(col, AI_PIECE)
+    score = connect_four.minimax(board, depth - 1, alpha, beta, False, _table, deadline, stats)[1]
+    if score > alpha:
+        _publish_alpha(search_id, score)
+    return col, score, alpha, (stats.nodes, stats.expanded, stats.cutoffs)
+
+def _ready(_):
+    return os.getpid()
+
+class ParallelSearch:
+    # Busca Connect Four com divisão na raiz (estilo Young Brothers Wait): a
+    # primeira coluna é buscada sozinha, com janela completa, e as demais vão
+    # para um ProcessPoolExecutor com o alfa que ela produziu
+    def __init__(self, workers=None, table=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.table = table if table is not None else TranspositionTable()
+        self.shared = Array('d', [0.0, -math.inf])
+        self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.shared,))
+        self.search_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    def warm_up(self):
+        # Inicia todos os processos antes de uma medição de tempo
+        list(self.executor.map(_ready, range(self.workers)))
+
+    def minimax(self, board, depth, alpha=-math.inf, beta=math.inf, first_column=None, deadline=None, stats=None):
+        # Mesmo contrato de connect_four.minimax na raiz (jogador maximizador): (coluna, pontuação)
+        if depth <= 1 or connect_four.is_terminal_node(board):
+            return connect_four.minimax(board, depth, alpha, beta, True, self.table, deadline, stats)
+
+        order = [col for col in (ORDER_FROM[first_column] if first_column is not None else SEARCH_ORDER) if board.can_play(col)]
+        self.search_id += 1
+        search_id = self.search_id
+
+        # Irmão mais velho: buscado neste processo antes de dividir o trabalho
+        eldest = order[0]
+        board.make_move(eldest, AI_PIECE)
+        try:
+            value = connect_four.minimax(board, depth - 1, alpha, beta, False, self.table, deadline, stats)[1]
+        finally:
+            board.unmake_move(eldest)
+        column = eldest
+        if value >= beta or len(order) == 1:
+            return column, value
+        alpha = max(alpha, value)
+
+        with self.shared.get_lock():
+            self.shared[0] = search_id
+            self.shared[1] = alpha
+
+        time_budget_ms = None
+        if deadline is not None:
+            deadline.check()
+            time_budget_ms = (deadline.end - time.perf_counter()) * 1000
+        futures = [
+            self.executor.submit(_search_column, board, col, depth, alpha, beta, search_id, time_budget_ms)
+            for col in order[1:]
+        ]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        if pending:
+            # Algum processo estourou o tempo (ou falhou): descarta os demais
+            for future in pending:
+                future.cancel()
+            wait(pending)
+
+        results = {}
+        for future in futures:
+            if future.cancelled():
+                continue
+            col, score, searched_alpha, (nodes, expanded, cutoffs) = future.result()
+            if stats is not None:
+                stats.nodes += nodes
+                stats.expanded += expanded
+                stats.cutoffs += cutoffs
+            # Só vale um valor exato, maior que o alfa com que a coluna foi buscada
+            if score > searched_alpha:
+                results[col] = score
+        if stats is not None:
+            stats.nodes += 1
+            stats.expanded += 1
+
+        # Empates ficam com a coluna que vem antes na ordem de busca, como na busca sequencial
+        for col in order[1:]:
+            if col in results and results[col] > value:
+                column, value = col, results[col]
+        return column, value
+
+    def search(self, board, time_budget_ms):
+        # Aprofundamento iterativo com a mesma interface de connect_four.search
+        position = board.copy()
+        self.table.new_search()
+
+        def search_depth(depth, best_column, deadline):
+            return self.minimax(position, depth, first_column=best_column, deadline=deadline)
+
+        return iterative_deepening(search_depth, time_budget_ms, connect_four.ROW_COUNT * connect_four.COLUMN_COUNT - board.moves)
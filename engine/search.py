@@ -0,0 +1,83 @@
+import math
+import time
+
+class SearchTimeout(Exception):
+    pass
+
+class SearchCancelled(Exception):
+    # Ao contrário de SearchTimeout, não é tratada pelo aprofundamento
+    # iterativo: a busca inteira é abandonada, sem resultado
+    pass
+
+class Deadline:
+    __slots__ = ("end", "cancel")
+
+    def __init__(self, time_budget_ms, cancel=None):
+        self.end = time.perf_counter() + time_budget_ms / 1000
+        # Evento (threading.Event) que, quando ligado, cancela a busca
+        self.cancel = cancel
+
+    def expired(self):
+        return time.perf_counter() >= self.end
+
+    def check(self):
+        # Chamado a cada nó; interrompe a busca assim que o tempo acaba
+        if time.perf_counter() >= self.end:
+            raise SearchTimeout()
+        if self.cancel is not None and self.cancel.is_set():
+            raise SearchCancelled()
+
+def iterative_deepening(search_depth, time_budget_ms, max_depth, cancel=None, pondered=None):
+    # search_depth(depth, best_move, deadline) -> (move, score) busca uma
+    # profundidade completa, usando best_move (da profundidade anterior) para
+    # ordenar a raiz. Retorna (move, score, depth) da última profundidade concluída.
+    # Com cancel, SearchCancelled sai daqui assim que o evento for ligado.
+    # pondered é o resultado (move, score, depth, seconds) de pondering para
+    # esta posição: o tempo já gasto nela sai do orçamento, e a busca só
+    # substitui esse resultado se passar da profundidade dele
+    if pondered is not None:
+        time_budget_ms -= pondered[3] * 1000
+        if time_budget_ms <= 0 or pondered[2] >= max_depth:
+            return pondered[:3]
+    deadline = Deadline(time_budget_ms, cancel)
+    # A primeira profundidade não tem limite de tempo, só o cancelamento
+    first_deadline = Deadline(math.inf, cancel) if cancel is not None else None
+    best_move, best_score, completed = None, None, 0
+
+    for depth in range(1, max(max_depth, 1) + 1):
+        try:
+            # A primeira profundidade sempre termina, para haver uma jogada
+            move, score = search_depth(depth, best_move, deadline if completed else first_deadline)
+        except SearchTimeout:
+            break
+        best_move, best_score, completed = move, score, depth
+        if deadline.expired():
+            break
+
+    if pondered is not None and pondered[2] > completed:
+        return pondered[:3]
+    return best_move, best_score, completed
+
+def pondering(searches, max_depth, results, cancel=None):
+    # Busca no tempo do adversário. searches é uma lista de (chave,
+    # search_depth), uma por resposta possível dele, com a mais provável
+    # primeiro; as respostas são aprofundadas juntas, uma profundidade de cada
+    # vez em todas, até o cancelamento (SearchCancelled, quando o adversário
+    # joga) ou até max_depth. results[chave] recebe (move, score, depth,
+    # seconds) a cada profundidade concluída, com o tempo total gasto na
+    # resposta, inclusive o da profundidade interrompida: é o que a busca
+    # depois aproveita pela tabela de transposição compartilhada
+    deadline = Deadline(math.inf, cancel)
+    for depth in range(1, max(max_depth, 1) + 1):
+        for key, search_depth in searches:
+            entry = results.get(key)
+            spent = entry[3] if entry is not None else 0.0
+            start = time.perf_counter()
+            try:
+                move, score = search_depth(depth, entry[0] if entry is not None else None, deadline)
+            except SearchCancelled:
+                if entry is not None:
+                    results[key] = entry[:3] + (spent + time.perf_counter() - start,)
+                raise
+            results[key] = (move, score, depth, spent + time.perf_counter() - start)
+    return results
@@ -0,0 +1,131 @@
+import argparse
+import random
+import sys
+import time
+from math import inf
+
+from engine import checkers
+from engine.tablebase import Tablebase
+from engine.transposition import TranspositionTable
+
+# Partidas de damas entre duas configurações do motor, a partir de aberturas
+# sorteadas e jogando as duas cores, para comparar força de jogo e latência
+
+def random_openings(count, plies, seed=0):
+    # Posições distintas alcançadas com plies jogadas aleatórias (respeitando a
+    # captura obrigatória) a partir da posição inicial: [(texto, cor a jogar)]
+    rng = random.Random(seed)
+    openings = []
+    seen = set()
+    attempts = 0
+    while len(openings) < count and attempts < count * 100:
+        attempts += 1
+        position = checkers.Position()
+        side = checkers.WHITE
+        for _ in range(plies):
+            moves = checkers.get_all_moves(position, side)
+            captures = [move for move in moves if move[2]]
+            position.make_move(*rng.choice(captures or moves))
+            side = -side
+        key = (checkers.to_string(position), side)
+        if key not in seen and position.winner() is None:
+            seen.add(key)
+            openings.append(key)
+    return openings
+
+class EnginePlayer:
+    # Busca de profundidade fixa com tabela e heurísticas próprias, ou, com
+    # time_budget_ms, aprofundamento iterativo com esse tempo por lance
+    def __init__(self, depth, quiescence_nodes=checkers.QUIESCENCE_NODES, tablebase=None, time_budget_ms=None):
+        self.depth = depth
+        self.quiescence_nodes = quiescence_nodes
+        self.tablebase = tablebase
+        self.time_budget_ms = time_budget_ms
+        self.table = TranspositionTable()
+        self.ordering = checkers.MoveOrdering()
+        self.moves = 0
+        self.seconds = 0.0
+
+    def __str__(self):
+        if self.time_budget_ms is not None:
+            text = f"{self.time_budget_ms} ms por lance"
+        else:
+            text = f"profundidade {self.depth}, quiescência {self.quiescence_nodes or 'desligada'}"
+        if self.tablebase is not None:
+            text += f", finais até {self.tablebase.max_pieces} peças"
+        return text
+
+    def choose(self, position, side):
+        start = time.perf_counter()
+        if self.time_budget_ms is not None:
+            move, _, _ = checkers.search(position, self.time_budget_ms, side == checkers.WHITE, self.table, self.ordering,
+                                         self.tablebase)
+        else:
+            self.table.new_search()
+            self.ordering.clear()
+            _, move = checkers.minimax(position.copy(), self.depth, -inf, inf, side == checkers.WHITE,
+                                       table=self.table, ordering=self.ordering, quiescence_nodes=self.quiescence_nodes,
+                                       tablebase=self.tablebase)
+        self.seconds += time.perf_counter() - start
+        self.moves += 1
+        return move
+
+def play_game(text, side, white, black, max_plies=150):
+    # Retorna a cor vencedora ou None (empate por limite de lances) e os lances jogados
+    position = checkers.from_string(text)
+    players = {checkers.WHITE: white, checkers.BLACK: black}
+    moves = []
+    for _ in range(max_plies):
+        winner = position.winner()
+        if winner is not None:
+            return winner, moves
+        move = players[side].choose(position, side)
+        position.make_move(*move)
+        moves.append(move)
+        side = -side
+    return position.winner(), moves
+
+def match(first, second, openings, max_plies=150):
+    # Cada abertura é jogada duas vezes, trocando as cores. Retorna (vitórias,
+    # empates, derrotas) do ponto de vista de first
+    wins = draws = losses = 0
+    for text, side in openings:
+        for white, black in ((first, second), (second, first)):
+            winner, _ = play_game(text, side, white, black, max_plies)
+            if winner is None:
+                draws += 1
+            elif (winner == checkers.WHITE) == (white is first):
+                wins += 1
+            else:
+                losses += 1
+    return wins, draws, losses
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partidas de damas entre duas configurações do motor.")
+    parser.add_argument("--depth", type=int, default=4, help="profundidade do motor avaliado")
+    parser.add_argument("--quiescence", type=int, default=checkers.QUIESCENCE_NODES,
+                        help="limite de nós da quiescência do motor avaliado (0 desliga)")
+    parser.add_argument("--tablebase", help="tabela de finais (engine.tablebase) do motor avaliado")
+    parser.add_argument("--reference-depth", type=int, default=7)
+    parser.add_argument("--reference-quiescence", type=int, default=0)
+    parser.add_argument("--openings", type=int, default=20)
+    parser.add_argument("--opening-plies", type=int, default=4)
+    parser.add_argument("--max-plies", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    tablebase = Tablebase(args.tablebase) if args.tablebase else None
+    first = EnginePlayer(args.depth, args.quiescence, tablebase)
+    second = EnginePlayer(args.reference_depth, args.reference_quiescence)
+    openings = random_openings(args.openings, args.opening_plies, args.seed)
+    wins, draws, losses = match(first, second, openings, args.max_plies)
+    games = wins + draws + losses
+    print(f"{first}  contra  {second}")
+    print(f"{games} partidas: {wins} vitórias, {draws} empates, {losses} derrotas "
+          f"(pontuação {(wins + draws / 2) / games:.1%})")
+    for player in (first, second):
+        print(f"{player}: {1000 * player.seconds / max(player.moves, 1):.1f} ms por lance")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
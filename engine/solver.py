@@ -0,0 +1,307 @@
+import argparse
+import random
+import sys
+import time
+from array import array
+
+from engine import connect_four
+from engine.connect_four import AI_PIECE, COLUMN_COUNT, COLUMN_HEIGHT, PLAYER_PIECE, ROW_COUNT, SEARCH_ORDER, from_moves
+from engine.transposition import TranspositionTable
+
+# Solucionador exato do Connect Four: o valor teórico da posição para quem
+# joga, sem avaliação heurística. Trabalha direto sobre os bitboards de
+# Position (coluna c ocupa os bits c * COLUMN_HEIGHT .. c * COLUMN_HEIGHT + ROW_COUNT - 1)
+# com duas máscaras: as peças de quem joga e todas as peças.
+#
+# Pontuação: 0 é empate; vitória de quem joga vale (CELLS + 1 - n) // 2, onde n
+# é o número de peças no tabuleiro antes da jogada vencedora (quanto mais cedo,
+# maior); derrota vale o mesmo, negativo, do ponto de vista do adversário.
+# O modo fraco só decide vitória/empate/derrota (pontuação -1, 0 ou 1), o forte
+# dá a pontuação exata e com ela a distância até o fim (plies_to_end)
+CELLS = ROW_COUNT * COLUMN_COUNT
+MIN_SCORE = -(CELLS // 2) + 3
+MAX_SCORE = (CELLS + 1) // 2 - 3
+
+BOTTOM_MASK = sum(1 << col * COLUMN_HEIGHT for col in range(COLUMN_COUNT))
+BOARD_MASK = BOTTOM_MASK * ((1 << ROW_COUNT) - 1)
+COLUMN_MASKS = [((1 << ROW_COUNT) - 1) << col * COLUMN_HEIGHT for col in range(COLUMN_COUNT)]
+# Colunas na ordem de busca, do centro para as bordas, com as máscaras
+ORDERED_COLUMNS = [(col, COLUMN_MASKS[col]) for col in SEARCH_ORDER]
+
+# Tamanho da tabela de transposição (primo, para espalhar as chaves)
+TABLE_SIZE = 1048583
+
+def winning_cells(position, mask):
+    # Casas vazias que completariam quatro em linha para as peças de position.
+    # Vertical, e para horizontal (deslocamento COLUMN_HEIGHT) e as diagonais
+    # (COLUMN_HEIGHT - 1 e + 1) os quatro padrões de três peças mais a casa vazia;
+    # desenrolado porque é chamado várias vezes por nó
+    r = (position << 1) & (position << 2) & (position << 3)
+
+    p = (position << 7) & (position << 14)
+    r |= p & (position << 21)
+    r |= p & (position >> 7)
+    p = (position >> 7) & (position >> 14)
+    r |= p & (position << 7)
+    r |= p & (position >> 21)
+
+    p = (position << 6) & (position << 12)
+    r |= p & (position << 18)
+    r |= p & (position >> 6)
+    p = (position >> 6) & (position >> 12)
+    r |= p & (position << 6)
+    r |= p & (position >> 18)
+
+    p = (position << 8) & (position << 16)
+    r |= p & (position << 24)
+    r |= p & (position >> 8)
+    p = (position >> 8) & (position >> 16)
+    r |= p & (position << 8)
+    r |= p & (position >> 24)
+
+    return r & (BOARD_MASK ^ mask)
+
+def plies_to_end(score, moves):
+    # Número de jogadas, contando a de agora, até a jogada que encerra a
+    # partida com essa pontuação (de quem joga com moves peças no tabuleiro);
+    # None para empate
+    if score == 0:
+        return None
+    # A jogada vencedora é feita com n peças no tabuleiro, n = CELLS + 1 - 2 *
+    # pontuação ou um a menos, com a paridade de quem vence: a de moves se
+    # quem joga vence, a de moves + 1 se perde
+    n = CELLS + 1 - 2 * abs(score)
+    if n % 2 != (moves if score > 0 else moves + 1) % 2:
+        n -= 1
+    return n - moves + 1
+
+class Solver:
+    # Negamax alfa-beta com janela nula sobre a pontuação exata. A tabela de
+    # transposição é de tamanho fixo (chave de 64 bits e valor de 8 bits em
+    # arrays), então a memória não cresce com a busca
+    def __init__(self, size=TABLE_SIZE):
+        self.size = size
+        self.keys = array('Q', bytes(8 * size))
+        self.values = array('b', bytes(size))
+        self.nodes = 0
+
+    def clear(self):
+        self.keys = array('Q', bytes(8 * self.size))
+        self.values = array('b', bytes(self.size))
+
+    def solve(self, board, piece=AI_PIECE, weak=False, deadline=None):
+        # Pontuação exata (ou só o sinal, no modo fraco) de board para piece,
+        # que é quem joga. deadline (engine.search.Deadline) permite cancelar
+        position = board.bitboards[piece]
+        mask = board.bitboards[PLAYER_PIECE] | board.bitboards[AI_PIECE]
+        return self._solve(position, mask, board.moves, weak, deadline)
+
+    def analyze(self, board, piece=AI_PIECE, weak=False, deadline=None):
+        # {coluna: pontuação para piece se jogar nela}
+        position = board.bitboards[piece]
+        mask = board.bitboards[PLAYER_PIECE] | board.bitboards[AI_PIECE]
+        scores = {}
+        for col in range(COLUMN_COUNT):
+            move = (mask + (1 << col * COLUMN_HEIGHT)) & COLUMN_MASKS[col]
+            if not move:
+                continue
+            if winning_cells(position, mask) & move:
+                scores[col] = 1 if weak else (CELLS + 1 - board.moves) // 2
+            else:
+                scores[col] = -self._solve(position ^ mask, mask | move, board.moves + 1, weak, deadline)
+        return scores
+
+    def best_move(self, board, piece=AI_PIECE, weak=False, deadline=None):
+        # (coluna, pontuação); entre colunas de mesma pontuação, a mais central
+        scores = self.analyze(board, piece, weak, deadline)
+        column = max((col for col in SEARCH_ORDER if col in scores), key=lambda col: scores[col])
+        return column, scores[column]
+
+    def _solve(self, position, mask, moves, weak, deadline):
+        if moves == CELLS:
+            return 0
+        if winning_cells(position, mask) & (mask + BOTTOM_MASK) & BOARD_MASK:
+            return 1 if weak else (CELLS + 1 - moves) // 2
+        low, high = -((CELLS - moves) // 2), (CELLS + 1 - moves) // 2
+        if weak:
+            low, high = -1, 1
+        # Busca binária com janelas nulas: cada busca responde se o valor é
+        # maior que middle, e a janela se estreita até um só valor. Os pontos
+        # de teste puxam para 0 e para as metades, onde os cortes são mais baratos
+        while low < high:
+            middle = low + (high - low) // 2
+            if middle <= 0 and int(low / 2) < middle:
+                middle = int(low / 2)
+            elif middle >= 0 and int(high / 2) > middle:
+                middle = int(high / 2)
+            result = self._negamax(position, mask, moves, middle, middle + 1, deadline)
+            if result <= middle:
+                high = result
+            else:
+                low = result
+        if weak:
+            return (low > 0) - (low < 0)
+        return low
+
+    def _negamax(self, position, mask, moves, alpha, beta, deadline):
+        # Supõe que quem joga não vence já na próxima jogada (a raiz e os
+        # filhos de jogadas que não perdem garantem isso)
+        if deadline is not None:
+            deadline.check()
+        self.nodes += 1
+        possible = (mask + BOTTOM_MASK) & BOARD_MASK
+        opponent_wins = winning_cells(position ^ mask, mask)
+        # Antecipação das derrotas: se o adversário ameaça ganhar em duas
+        # casas jogáveis, não há defesa; com uma, ela é a única jogada; e
+        # nunca se joga logo abaixo de uma casa vencedora do adversário
+        forced = possible & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                return -((CELLS - moves) // 2)
+            possible = forced
+        candidates = possible & ~(opponent_wins >> 1)
+        if not candidates:
+            return -((CELLS - moves) // 2)
+        if moves >= CELLS - 2:
+            return 0
+
+        # Ninguém vence na próxima jogada, o que limita a pontuação: a derrota
+        # mais rápida é na segunda jogada do adversário e a vitória mais rápida,
+        # na segunda de quem joga
+        low = -((CELLS - 2 - moves) // 2)
+        if alpha < low:
+            alpha = low
+            if alpha >= beta:
+                return alpha
+        high = (CELLS - 1 - moves) // 2
+        key = position + mask
+        index = key % self.size
+        if self.keys[index] == key:
+            value = self.values[index]
+            if value > MAX_SCORE - MIN_SCORE + 1:
+                # Limite inferior
+                low = value + 2 * MIN_SCORE - MAX_SCORE - 2
+                if alpha < low:
+                    alpha = low
+                    if alpha >= beta:
+                        return alpha
+            elif value:
+                # Limite superior
+                high = value + MIN_SCORE - 1
+        if beta > high:
+            beta = high
+            if alpha >= beta:
+                return beta
+
+        # Ordenação: jogadas que criam mais ameaças primeiro; empates na ordem
+        # das colunas (centro primeiro)
+        ordered = []
+        for col, column_mask in ORDERED_COLUMNS:
+            move = candidates & column_mask
+            if move:
+                threats = winning_cells(position | move, mask).bit_count()
+                ordered.append((-threats, len(ordered), move))
+        ordered.sort()
+
+        opponent = position ^ mask
+        for _, _, move in ordered:
+            score = -self._negamax(opponent, mask | move, moves + 1, -beta, -alpha, deadline)
+            if score >= beta:
+                self.keys[index] = key
+                self.values[index] = score + MAX_SCORE - 2 * MIN_SCORE + 2
+                return score
+            if score > alpha:
+                alpha = score
+        self.keys[index] = key
+        self.values[index] = alpha - MIN_SCORE + 1
+        return alpha
+
+def random_positions(count, plies, seed):
+    # Sequências de colunas (para from_moves) de partidas aleatórias com
+    # plies peças, sem vitória já feita nem vitória imediata de quem joga
+    rng = random.Random(seed)
+    found = 0
+    while found < count:
+        board = connect_four.create_board()
+        moves = []
+        while len(moves) < plies and not connect_four.is_terminal_node(board):
+            col = rng.choice([c for c in range(COLUMN_COUNT) if board.can_play(c)])
+            board.make_move(col, PLAYER_PIECE if len(moves) % 2 else AI_PIECE)
+            moves.append(col)
+        if len(moves) < plies or connect_four.is_terminal_node(board):
+            continue
+        text = "".join(str(col + 1) for col in moves)
+        board = from_moves(text)
+        mask = board.bitboards[PLAYER_PIECE] | board.bitboards[AI_PIECE]
+        if winning_cells(board.bitboards[AI_PIECE], mask) & (mask + BOTTOM_MASK) & BOARD_MASK:
+            continue
+        found += 1
+        yield text
+
+def audit(positions, time_budget_ms, solver=None):
+    # Compara a jogada da IA heurística (connect_four.search com o tempo dado,
+    # tabela nova a cada posição) com o valor exato de cada coluna. Gera
+    # (posição, coluna da IA, pontuações exatas por coluna)
+    solver = solver if solver is not None else Solver()
+    for text in positions:
+        board = from_moves(text)
+        scores = solver.analyze(board)
+        column, _, _ = connect_four.search(board, time_budget_ms, TranspositionTable())
+        yield text, column, scores
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve posições do Connect Four (valor teórico exato).")
+    parser.add_argument("positions", nargs="*", help="colunas jogadas a partir de 1, ex.: 4453 (\"\" para o tabuleiro vazio)")
+    parser.add_argument("--weak", action="store_true", help="só vitória, empate ou derrota (mais rápido)")
+    parser.add_argument("--analyze", action="store_true", help="mostra a pontuação de cada coluna")
+    parser.add_argument("--audit", type=int, metavar="N",
+                        help="em vez de POSITIONS, mede a IA heurística contra o valor exato em N posições aleatórias")
+    parser.add_argument("--plies", type=int, default=16, help="peças nas posições de --audit")
+    parser.add_argument("--time", type=int, default=1000, help="tempo da IA por jogada em --audit (ms)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    solver = Solver()
+    if args.audit:
+        return run_audit(args, solver)
+    if not args.positions:
+        parser.error("informe posições ou --audit")
+    for moves in args.positions:
+        board = from_moves(moves)
+        start = time.perf_counter()
+        solver.nodes = 0
+        if args.analyze:
+            scores = solver.analyze(board, weak=args.weak)
+            column = max((col for col in SEARCH_ORDER if col in scores), key=lambda col: scores[col])
+            score = scores[column]
+        else:
+            score = solver.solve(board, weak=args.weak)
+        seconds = time.perf_counter() - start
+        result = "empate" if score == 0 else ("vitória" if score > 0 else "derrota")
+        if not args.weak and score:
+            result += f" em {plies_to_end(score, board.moves)} jogadas"
+        line = f"{moves or '-'}: {result} (pontuação {score}), {solver.nodes} nós, {seconds:.2f}s"
+        if args.analyze:
+            line += f", melhor coluna {column + 1}, " + " ".join(
+                f"{col + 1}:{scores[col]}" for col in range(COLUMN_COUNT) if col in scores)
+        print(line, flush=True)
+    return 0
+
+def run_audit(args, solver):
+    # Jogada ótima: de pontuação exata máxima; que preserva o valor: mesmo
+    # resultado (vitória, empate ou derrota) da melhor
+    optimal = preserving = total = 0
+    for text, column, scores in audit(random_positions(args.audit, args.plies, args.seed), args.time, solver):
+        best = max(scores.values())
+        total += 1
+        optimal += scores[column] == best
+        same = (scores[column] > 0) - (scores[column] < 0) == (best > 0) - (best < 0)
+        preserving += same
+        if not same:
+            print(f"{text}: IA jogou {column + 1} ({scores[column]}), melhor {best} em "
+                  + " ".join(str(col + 1) for col in sorted(scores) if scores[col] == best), flush=True)
+    print(f"{total} posições com {args.plies} peças, {args.time} ms por jogada: "
+          f"jogada ótima em {optimal / total:.0%}, resultado preservado em {preserving / total:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
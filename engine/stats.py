@@ -0,0 +1,142 @@
+import json
+import os
+import sys
+import time
+
+# Variável de ambiente que liga a coleta nas interfaces: "-" imprime cada
+# profundidade concluída em stderr; um caminho acrescenta ao arquivo uma linha
+# JSON por busca
+STATS_ENV = "ENGINE_STATS"
+
+def _no_clock():
+    return 0.0
+
+class SearchStats:
+    # Contadores de uma busca: nós visitados, nós expandidos (com filhos
+    # buscados) e nós expandidos encerrados por corte alfa-beta, mais os
+    # detalhes por profundidade restante, a tabela de transposição, as
+    # avaliações e a variante principal. Os minimax só chamam estes métodos
+    # com stats não None, então sem coletor o custo é uma comparação por nó.
+    # Com timing, mede também o tempo gasto gerando jogadas e avaliando
+    def __init__(self, timing=False, live=None, path=None):
+        self.nodes = 0
+        self.expanded = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.evaluations = 0
+        self.movegen_seconds = 0.0
+        self.eval_seconds = 0.0
+        self.depth_nodes = {}
+        self.depth_cutoffs = {}
+        # Variante principal de cada nó, pela profundidade restante: cada nó
+        # zera a sua ao entrar e a monta com a do filho que melhora o valor
+        self.pv = {}
+        self.iterations = []
+        self.clock = time.perf_counter if timing else _no_clock
+        self.live = live
+        self.path = path
+        self.start = time.perf_counter()
+
+    def node(self, depth):
+        self.nodes += 1
+        self.depth_nodes[depth] = self.depth_nodes.get(depth, 0) + 1
+        self.pv[depth] = []
+
+    def cutoff(self, depth, first):
+        # first: o corte veio da primeira jogada buscada no nó
+        self.cutoffs += 1
+        self.depth_cutoffs[depth] = self.depth_cutoffs.get(depth, 0) + 1
+        if first:
+            self.first_move_cutoffs += 1
+
+    def tt_probe(self, hit):
+        self.tt_probes += 1
+        if hit:
+            self.tt_hits += 1
+
+    def generated(self, start):
+        # start = self.clock() antes da geração de jogadas
+        self.movegen_seconds += self.clock() - start
+
+    def evaluated(self, start):
+        self.evaluations += 1
+        self.eval_seconds += self.clock() - start
+
+    def update_pv(self, depth, move):
+        self.pv[depth] = [move] + self.pv.get(depth - 1, [])
+
+    def principal_variation(self):
+        if self.iterations:
+            return self.iterations[-1]["pv"]
+        return self.pv[max(self.pv)] if self.pv else []
+
+    def complete_depth(self, depth, move, score):
+        # Chamado pelo aprofundamento iterativo ao fim de cada profundidade
+        iteration = {
+            "depth": depth,
+            "move": move,
+            "score": score,
+            "nodes": self.nodes,
+            "seconds": time.perf_counter() - self.start,
+            "pv": self.pv.get(depth, []),
+        }
+        self.iterations.append(iteration)
+        if self.live is not None:
+            print(f"profundidade {depth}: {self.nodes} nós, {iteration['seconds'] * 1000:.0f} ms, "
+                  f"pontuação {score}, cortes na 1ª jogada {self.first_move_cutoff_rate():.0%}, "
+                  f"TT {self.tt_hit_rate():.0%}, pv {' '.join(map(str, iteration['pv']))}",
+                  file=self.live, flush=True)
+
+    def branching_factor(self):
+        # Cada nó visitado, exceto a raiz, é filho de um nó expandido
+        return (self.nodes - 1) / self.expanded if self.expanded else 0.0
+
+    def cutoff_rate(self):
+        return self.cutoffs / self.expanded if self.expanded else 0.0
+
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def as_dict(self):
+        return {
+            "nodes": self.nodes,
+            "expanded": self.expanded,
+            "cutoffs": self.cutoffs,
+            "branching_factor": self.branching_factor(),
+            "cutoff_rate": self.cutoff_rate(),
+            "first_move_cutoff_rate": self.first_move_cutoff_rate(),
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "tt_hit_rate": self.tt_hit_rate(),
+            "evaluations": self.evaluations,
+            "movegen_seconds": self.movegen_seconds,
+            "eval_seconds": self.eval_seconds,
+            "nodes_by_depth": {str(depth): n for depth, n in sorted(self.depth_nodes.items())},
+            "cutoffs_by_depth": {str(depth): n for depth, n in sorted(self.depth_cutoffs.items())},
+            "principal_variation": [str(move) for move in self.principal_variation()],
+            "iterations": [dict(iteration, move=str(iteration["move"]), pv=[str(move) for move in iteration["pv"]])
+                           for iteration in self.iterations],
+        }
+
+    def to_json(self, **extra):
+        return json.dumps(dict(self.as_dict(), **extra))
+
+    def finish(self, **extra):
+        # Grava a busca no arquivo de ENGINE_STATS, se houver
+        if self.path is not None:
+            with open(self.path, "a") as f:
+                f.write(self.to_json(**extra) + "\n")
+
+def from_environment():
+    # Coletor configurado por ENGINE_STATS, ou None (coleta desligada)
+    target = os.environ.get(STATS_ENV)
+    if not target:
+        return None
+    if target == "-":
+        return SearchStats(timing=True, live=sys.stderr)
+    return SearchStats(timing=True, path=target)
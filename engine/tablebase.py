@@ -0,0 +1,325 @@
+import argparse
+import mmap
+import struct
+import sys
+import time
+from array import array
+from itertools import combinations
+from math import comb
+
+from engine.checkers import (
+    BLACK, COLS, EMPTY, KING, ROWS, WHITE, Position, legal_moves, square, zobrist_hash,
+)
+
+# Tabela de finais das damas por análise retrógrada. Para cada distribuição de
+# material (peças comuns e damas de cada cor) com até max_pieces peças, cada
+# posição tem um índice calculado por um hash perfeito da colocação das peças
+# nas casas escuras, e cada índice guarda um byte com sinal por cor a jogar:
+#   +d  quem joga vence, e o jogo acaba em d - 1 lances
+#   -d  quem joga perde, e o jogo acaba em d - 1 lances
+#    0  empate (nenhum dos lados consegue forçar a vitória)
+# INVALID marca colocações impossíveis (peça comum na linha de promoção).
+MAGIC = b"CKTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+SIGNATURE = struct.Struct("<BBBBQI")
+INVALID = -128
+MAX_DISTANCE = 127
+
+# Pontuação de uma posição resolvida, na escala de evaluate(): muito maior que
+# qualquer avaliação, menos a distância, para preferir vitórias rápidas
+TABLEBASE_WIN = 1000.0
+
+DEFAULT_PIECES = 3
+
+# Casas jogáveis (escuras), na ordem do tabuleiro
+DARK_SQUARES = [square(row, col) for row in range(ROWS) for col in range(COLS) if row % 2 == (col + 1) % 2]
+
+# Ordem dos tipos de peça no hash e na assinatura de material
+PIECE_TYPES = (WHITE, WHITE * KING, BLACK, BLACK * KING)
+
+def signature_of(position):
+    # (peças brancas comuns, damas brancas, peças pretas comuns, damas pretas)
+    return (
+        position.white_left - position.white_kings, position.white_kings,
+        position.black_left - position.black_kings, position.black_kings,
+    )
+
+def _rank(indexes):
+    # Posição de um conjunto de índices crescentes na ordem colexicográfica
+    return sum(comb(index, k + 1) for k, index in enumerate(indexes))
+
+def placement_count(signature):
+    count = 1
+    free = len(DARK_SQUARES)
+    for n in signature:
+        count *= comb(free, n)
+        free -= n
+    return count
+
+def placement_index(signature, groups):
+    # Hash perfeito: groups tem, para cada tipo de peça, as casas (índices em
+    # DARK_SQUARES, crescentes). Cada grupo é numerado entre as casas que os
+    # grupos anteriores deixaram livres, em base mista
+    index = 0
+    used = []
+    free = len(DARK_SQUARES)
+    for n, group in zip(signature, groups):
+        relative = [i - sum(1 for u in used if u < i) for i in group]
+        index = index * comb(free, n) + _rank(relative)
+        used.extend(group)
+        free -= n
+    return index
+
+def position_index(position):
+    groups = ([], [], [], [])
+    for i, sq in enumerate(DARK_SQUARES):
+        piece = position.squares[sq]
+        if piece:
+            groups[PIECE_TYPES.index(piece)].append(i)
+    return placement_index([len(group) for group in groups], groups)
+
+def _placements(signature):
+    # Todas as colocações de uma assinatura, como grupos de índices de casas
+    def place(types, free):
+        if not types:
+            yield []
+            return
+        for group in combinations(free, types[0]):
+            rest = [i for i in free if i not in group]
+            for groups in place(types[1:], rest):
+                yield [list(group)] + groups
+    return place(list(signature), list(range(len(DARK_SQUARES))))
+
+def _position_from(groups):
+    position = Position.__new__(Position)
+    position.squares = array('b', [EMPTY] * (ROWS * COLS))
+    position.white_left = position.black_left = 0
+    position.white_kings = position.black_kings = 0
+    for piece, group in zip(PIECE_TYPES, groups):
+        for i in group:
+            position.squares[DARK_SQUARES[i]] = piece
+            if piece > 0:
+                position.white_left += 1
+                position.white_kings += piece == WHITE * KING
+            else:
+                position.black_left += 1
+                position.black_kings += piece == BLACK * KING
+    position.hash = zobrist_hash(position.squares)
+    return position
+
+def _is_valid(groups):
+    # Peças comuns nunca ficam na linha em que seriam promovidas
+    white_men, _, black_men, _ = groups
+    return (all(DARK_SQUARES[i] // COLS != 0 for i in white_men)
+            and all(DARK_SQUARES[i] // COLS != ROWS - 1 for i in black_men))
+
+def signatures(max_pieces):
+    # Assinaturas com pelo menos uma peça de cada cor, em ordem de resolução:
+    # capturas levam a menos peças e promoções a menos peças comuns, então
+    # ambas apontam para assinaturas resolvidas antes
+    result = []
+    for total in range(2, max_pieces + 1):
+        for white in range(1, total):
+            black = total - white
+            for white_kings in range(white + 1):
+                for black_kings in range(black + 1):
+                    result.append((white - white_kings, white_kings, black - black_kings, black_kings))
+    result.sort(key=lambda s: (sum(s), s[0] + s[2]))
+    return result
+
+def solve_signature(signature, lookup):
+    # Análise retrógrada de uma assinatura. lookup(posição, cor a jogar) dá o
+    # valor (já resolvido) das posições de outras assinaturas. Retorna um
+    # array('b') com 2 * placement_count(signature) valores: brancas a jogar
+    # nos índices [0, n) e pretas em [n, 2n)
+    count = placement_count(signature)
+    values = array('b', [0]) * (2 * count)
+    resolved = bytearray(2 * count)
+    remaining = [0] * (2 * count)
+    longest_win = [0] * (2 * count)
+    predecessors = {}
+    buckets = [[] for _ in range(MAX_DISTANCE + 1)]
+
+    def push(node, distance, wins):
+        if distance > MAX_DISTANCE:
+            raise ValueError(f"Distância maior que {MAX_DISTANCE} em {signature}")
+        buckets[distance - 1].append((node, wins))
+
+    for groups in _placements(signature):
+        index = placement_index(signature, groups)
+        if not _is_valid(groups):
+            values[index] = values[count + index] = INVALID
+            resolved[index] = resolved[count + index] = 1
+            continue
+        position = _position_from(groups)
+        winner = position.winner()
+        for side_index, side in enumerate((WHITE, BLACK)):
+            node = side_index * count + index
+            if winner is not None:
+                push(node, 1, winner == side)
+                continue
+            # Filhos: na mesma assinatura (movimento simples) viram arestas do
+            # grafo; os demais já têm valor conhecido
+            children = 0
+            wins = False
+            for move in legal_moves(position, side):
+                undo = position.make_move(*move)
+                if signature_of(position) == signature:
+                    child = (1 - side_index) * count + position_index(position)
+                    predecessors.setdefault(child, []).append(node)
+                    children += 1
+                else:
+                    value = lookup(position, -side)
+                    if value < 0:
+                        push(node, 1 - value, True)
+                        wins = True
+                    elif value > 0:
+                        longest_win[node] = max(longest_win[node], value)
+                    else:
+                        # Empate: um filho que nunca é resolvido, então o nó
+                        # não pode virar derrota
+                        children += 1
+                position.unmake_move(undo)
+            # Uma vitória já conhecida também impede que o nó vire derrota
+            remaining[node] = children + wins
+            if not remaining[node]:
+                push(node, longest_win[node] + 1, False)
+
+    # Resolve em ordem crescente de distância: vitória assim que algum filho
+    # perde, derrota quando o último filho vence
+    for distance, bucket in enumerate(buckets, 1):
+        for node, wins in bucket:
+            if resolved[node]:
+                continue
+            resolved[node] = 1
+            values[node] = distance if wins else -distance
+            for parent in predecessors.get(node, ()):
+                if resolved[parent]:
+                    continue
+                if not wins:
+                    push(parent, distance + 1, True)
+                else:
+                    remaining[parent] -= 1
+                    longest_win[parent] = max(longest_win[parent], distance)
+                    if not remaining[parent]:
+                        push(parent, longest_win[parent] + 1, False)
+    return values
+
+def _no_pieces_value(position, side):
+    # Sem peças de um lado a partida acabou; quem ficou sem peças perdeu
+    if position.white_left <= 0:
+        return -1 if side == WHITE else 1
+    if position.black_left <= 0:
+        return -1 if side == BLACK else 1
+    return None
+
+def build(path, max_pieces=DEFAULT_PIECES, verbose=False):
+    tables = {}
+
+    def lookup(position, side):
+        value = _no_pieces_value(position, side)
+        if value is not None:
+            return value
+        signature = signature_of(position)
+        side_index = 0 if side == WHITE else 1
+        return tables[signature][side_index * placement_count(signature) + position_index(position)]
+
+    for signature in signatures(max_pieces):
+        start = time.perf_counter()
+        tables[signature] = solve_signature(signature, lookup)
+        if verbose:
+            values = tables[signature]
+            print(f"{signature}: {len(values)} posições, {sum(v > 0 for v in values)} vitórias, "
+                  f"{sum(0 > v > INVALID for v in values)} derrotas, {sum(v == 0 for v in values)} empates "
+                  f"({time.perf_counter() - start:.1f}s)", flush=True)
+
+    offset = HEADER.size + SIGNATURE.size * len(tables)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, max_pieces, len(tables)))
+        for signature, values in tables.items():
+            f.write(SIGNATURE.pack(*signature, offset, len(values) // 2))
+            offset += len(values)
+        for values in tables.values():
+            values.tofile(f)
+
+class Tablebase:
+    # Leitura da tabela por mmap: só as páginas consultadas vão para a memória
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_pieces, count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} não é uma tabela de finais de damas")
+        self.signatures = {}
+        for i in range(count):
+            *signature, offset, positions = SIGNATURE.unpack_from(self.data, HEADER.size + i * SIGNATURE.size)
+            self.signatures[tuple(signature)] = (offset, positions)
+        self.probes = 0
+        self.hits = 0
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def covers(self, position):
+        return position.white_left + position.black_left <= self.max_pieces
+
+    def probe(self, position, side):
+        # Valor bruto (ver o início do módulo) ou None se a posição não está na tabela
+        self.probes += 1
+        value = _no_pieces_value(position, side)
+        if value is not None:
+            self.hits += 1
+            return value
+        entry = self.signatures.get(signature_of(position))
+        if entry is None:
+            return None
+        offset, positions = entry
+        value = self.data[offset + (0 if side == WHITE else positions) + position_index(position)]
+        value = value - 256 if value > 127 else value
+        if value == INVALID:
+            return None
+        self.hits += 1
+        return value
+
+    def score(self, position, side):
+        # Pontuação do ponto de vista das brancas, na escala de evaluate()
+        value = self.probe(position, side)
+        if value is None:
+            return None
+        if value == 0:
+            return 0.0
+        score = TABLEBASE_WIN - (abs(value) - 1)
+        if (value > 0) != (side == WHITE):
+            score = -score
+        return score
+
+    def best_move(self, position, side):
+        # Jogada que leva ao melhor valor para quem joga: vence o mais rápido
+        # possível, ou perde o mais devagar possível
+        best = None
+        for move in legal_moves(position, side):
+            undo = position.make_move(*move)
+            score = self.score(position, -side)
+            position.unmake_move(undo)
+            if score is None:
+                return None
+            if side == BLACK:
+                score = -score
+            if best is None or score > best[0]:
+                best = (score, move)
+        return best[1] if best else None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Constrói a tabela de finais das damas por análise retrógrada.")
+    parser.add_argument("output", help="arquivo da tabela")
+    parser.add_argument("--pieces", type=int, default=DEFAULT_PIECES, help="número máximo de peças no tabuleiro")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    build(args.output, args.pieces, verbose=True)
+    print(f"Tabela gravada em {args.output} ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
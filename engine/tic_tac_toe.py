@@ -0,0 +1,387 @@
+from math import inf as infinity
+
+from engine.search import iterative_deepening
+
+BOARD_SIZE = 3
+
+HUMAN = -1
+COMP = +1
+
+# Nós visitados pelo minimax
+cont = 0
+
+def create_board():
+    return [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+
+# Funções do jogo (mantidas da versão original)
+def evaluate(state):
+    if wins(state, COMP):
+        score = +1
+    elif wins(state, HUMAN):
+        score = -1
+    else:
+        score = 0
+    return score
+
+def wins(state, player):
+    win_state = [
+        [state[0][0], state[0][1], state[0][2]],
+        [state[1][0], state[1][1], state[1][2]],
+        [state[2][0], state[2][1], state[2][2]],
+        [state[0][0], state[1][0], state[2][0]],
+        [state[0][1], state[1][1], state[2][1]],
+        [state[0][2], state[1][2], state[2][2]],
+        [state[0][0], state[1][1], state[2][2]],
+        [state[2][0], state[1][1], state[0][2]],
+    ]
+    if [player, player, player] in win_state:
+        return True
+    else:
+        return False
+
+def game_over(state):
+    return wins(state, HUMAN) or wins(state, COMP)
+
+def empty_cells(state):
+    cells = []
+    for x, row in enumerate(state):
+        for y, cell in enumerate(row):
+            if cell == 0:
+                cells.append([x, y])
+    return cells
+
+def valid_move(state, x, y):
+    if [x, y] in empty_cells(state):
+        return True
+    else:
+        return False
+
+def set_move(state, x, y, player):
+    if valid_move(state, x, y):
+        state[x][y] = player
+        return True
+    else:
+        return False
+
+def minimax(state, depth, alpha, beta, player, deadline=None, first_move=None, stats=None):
+    global cont
+    if deadline is not None:
+        deadline.check()
+    if stats is not None:
+        stats.node(depth)
+        start = stats.clock()
+    if player == COMP:
+        best = [-1, -1, -infinity]
+    else:
+        best = [-1, -1, +infinity]
+
+    if depth == 0 or game_over(state):
+        score = evaluate(state)
+        if stats is not None:
+            stats.evaluated(start)
+        return [-1, -1, score]
+
+    if stats is not None:
+        stats.expanded += 1
+        start = stats.clock()
+    cells = empty_cells(state)
+    if stats is not None:
+        stats.generated(start)
+    if first_move in cells:
+        # Jogada da profundidade anterior primeiro
+        cells.remove(first_move)
+        cells.insert(0, first_move)
+
+    for cell in cells:
+        x, y = cell[0], cell[1]
+        state[x][y] = player
+        score = minimax(state, depth - 1, alpha, beta, -player, deadline, stats=stats)
+        state[x][y] = 0
+        score[0], score[1] = x, y
+
+        if player == COMP:
+            if score[2] > best[2]:
+                best = score
+                if stats is not None:
+                    stats.update_pv(depth, cell)
+            alpha = max(alpha, score[2])
+            if beta <= alpha:
+                if stats is not None:
+                    stats.cutoff(depth, cell is cells[0])
+                break
+        else:
+            if score[2] < best[2]:
+                best = score
+                if stats is not None:
+                    stats.update_pv(depth, cell)
+            beta = min(beta, score[2])
+            if beta <= alpha:
+                if stats is not None:
+                    stats.cutoff(depth, cell is cells[0])
+                break
+
+    cont = cont + 1
+    return best
+
+def search(state, time_budget_ms, player=COMP, stats=None, cancel=None):
+    # Aprofundamento iterativo sobre uma cópia: a busca interrompida deixaria
+    # jogadas pela metade no tabuleiro. Retorna ([x, y], pontuação, profundidade)
+    position = [row[:] for row in state]
+
+    def search_depth(depth, best_move, deadline):
+        x, y, score = minimax(position, depth, -infinity, infinity, player, deadline, best_move, stats)
+        if stats is not None:
+            stats.complete_depth(depth, [x, y], score)
+        return [x, y], score
+
+    return iterative_deepening(search_depth, time_budget_ms, len(empty_cells(state)), cancel)
+
+# Jogo m,n,k: tabuleiro rows x cols, vence quem fizer k em linha (3,3,3 é o jogo
+# da velha, 15,15,5 é o gomoku). As casas ficam numa lista plana (casa =
+# linha * cols + coluna) e cada linha de k casas tem um contador de peças por
+# jogador, atualizado a cada jogada: a vitória é detectada só nas linhas que
+# passam pela última casa jogada, e a avaliação é mantida incrementalmente.
+WIN_SCORE = 1000000000
+
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+def winning_lines(rows, cols, k):
+    # Todas as sequências de k casas em linha (horizontais, verticais e as duas
+    # diagonais) de um tabuleiro rows x cols, como listas de (linha, coluna)
+    lines = []
+    for dx, dy in DIRECTIONS:
+        for x in range(rows):
+            for y in range(cols):
+                end_x, end_y = x + (k - 1) * dx, y + (k - 1) * dy
+                if 0 <= end_x < rows and 0 <= end_y < cols:
+                    lines.append([(x + i * dx, y + i * dy) for i in range(k)])
+    return lines
+
+# Peso de uma linha ocupada só por um jogador, pelo número de peças nela
+def _line_weights(k):
+    return [0] + [10 ** (count - 1) for count in range(1, k)] + [0]
+
+_geometries = {}
+
+def _geometry(rows, cols, k, radius):
+    # Índices pré-calculados (compartilhados entre tabuleiros do mesmo formato):
+    # linhas de k casas, linhas que passam por cada casa e vizinhas de cada casa
+    key = (rows, cols, k, radius)
+    geometry = _geometries.get(key)
+    if geometry is None:
+        lines = [[x * cols + y for x, y in line] for line in winning_lines(rows, cols, k)]
+        lines_through = [[] for _ in range(rows * cols)]
+        for index, line in enumerate(lines):
+            for cell in line:
+                lines_through[cell].append(index)
+        neighbors = []
+        for x in range(rows):
+            for y in range(cols):
+                neighbors.append([
+                    nx * cols + ny
+                    for nx in range(max(0, x - radius), min(rows, x + radius + 1))
+                    for ny in range(max(0, y - radius), min(cols, y + radius + 1))
+                    if (nx, ny) != (x, y)
+                ])
+        geometry = _geometries[key] = (lines, lines_through, neighbors)
+    return geometry
+
+class MNKBoard:
+    __slots__ = ("rows", "cols", "k", "radius", "cells", "lines", "lines_through", "neighbors",
+                 "weights", "counts", "threats", "near", "score", "winner", "history")
+
+    def __init__(self, rows=15, cols=15, k=5, radius=2):
+        if k > max(rows, cols):
+            raise ValueError("k maior que o tabuleiro")
+        self.rows, self.cols, self.k, self.radius = rows, cols, k, radius
+        self.cells = [0] * (rows * cols)
+        self.lines, self.lines_through, self.neighbors = _geometry(rows, cols, k, radius)
+        self.weights = _line_weights(k)
+        # Peças de cada jogador em cada linha
+        self.counts = {COMP: [0] * len(self.lines), HUMAN: [0] * len(self.lines)}
+        # Linhas de cada jogador com k - 1 peças e nenhuma do adversário (falta
+        # uma casa para vencer), mantidas a cada jogada para candidate_moves
+        self.threats = {COMP: 0, HUMAN: 0}
+        # Quantas peças há a até radius casas de cada casa (candidatas a jogada)
+        self.near = [0] * (rows * cols)
+        # Avaliação do ponto de vista de COMP, mantida a cada jogada
+        self.score = 0
+        self.winner = 0
+        # (casa, avaliação anterior) de cada jogada, para desfazer
+        self.history = []
+
+    @classmethod
+    def from_state(cls, state, k=None, radius=2):
+        # A partir de um tabuleiro em listas (como os do jogo da velha)
+        board = cls(len(state), len(state[0]), k or len(state), radius)
+        for x, row in enumerate(state):
+            for y, cell in enumerate(row):
+                if cell:
+                    board.make_move(x * board.cols + y, cell)
+        return board
+
+    def copy(self):
+        board = MNKBoard.__new__(MNKBoard)
+        board.rows, board.cols, board.k, board.radius = self.rows, self.cols, self.k, self.radius
+        board.lines, board.lines_through, board.neighbors = self.lines, self.lines_through, self.neighbors
+        board.weights = self.weights
+        board.cells = self.cells[:]
+        board.counts = {player: counts[:] for player, counts in self.counts.items()}
+        board.threats = dict(self.threats)
+        board.near = self.near[:]
+        board.score = self.score
+        board.winner = self.winner
+        board.history = self.history[:]
+        return board
+
+    def make_move(self, cell, player):
+        self.history.append((cell, self.score))
+        self.cells[cell] = player
+        own = self.counts[player]
+        other = self.counts[-player]
+        weights = self.weights
+        threats = self.threats
+        k = self.k
+        score = self.score
+        for line in self.lines_through[cell]:
+            count = own[line]
+            own[line] = count + 1
+            if other[line]:
+                # Linha que era só do adversário deixa de valer
+                if not count:
+                    score += player * weights[other[line]]
+                    if other[line] == k - 1:
+                        threats[-player] -= 1
+            else:
+                score += player * (weights[count + 1] - weights[count])
+                if count + 1 == k - 1:
+                    threats[player] += 1
+                elif count + 1 == k:
+                    threats[player] -= 1
+                    self.winner = player
+        self.score = score
+        near = self.near
+        for neighbor in self.neighbors[cell]:
+            near[neighbor] += 1
+
+    def unmake_move(self):
+        cell, self.score = self.history.pop()
+        player = self.cells[cell]
+        self.cells[cell] = 0
+        own = self.counts[player]
+        other = self.counts[-player]
+        threats = self.threats
+        k = self.k
+        for line in self.lines_through[cell]:
+            count = own[line]
+            own[line] = count - 1
+            if other[line]:
+                if count == 1 and other[line] == k - 1:
+                    threats[-player] += 1
+            elif count == k - 1:
+                threats[player] -= 1
+            elif count == k:
+                threats[player] += 1
+        # Só a última jogada pode ter vencido
+        self.winner = 0
+        near = self.near
+        for neighbor in self.neighbors[cell]:
+            near[neighbor] -= 1
+
+    def is_full(self):
+        return len(self.history) == len(self.cells)
+
+    def candidate_moves(self, player=None):
+        # Casas vazias a até radius casas de alguma peça; no tabuleiro vazio, o centro.
+        # Com player (quem joga), as ameaças restringem a lista: se ele tem uma
+        # linha a uma casa da vitória, só as casas que vencem; senão, se o
+        # adversário tem, só as que bloqueiam (qualquer outra perde na hora)
+        if not self.history:
+            return [self.rows // 2 * self.cols + self.cols // 2]
+        if player is not None:
+            for side in (player, -player):
+                if self.threats[side]:
+                    return self.completing_cells(side)
+        cells, near = self.cells, self.near
+        moves = [cell for cell in range(len(cells)) if not cells[cell] and near[cell]]
+        moves.sort(key=near.__getitem__, reverse=True)
+        return moves
+
+    def completing_cells(self, player):
+        # Casas vazias que completam uma linha de player com k - 1 peças e
+        # nenhuma do adversário
+        own, other, cells = self.counts[player], self.counts[-player], self.cells
+        moves = []
+        for line, count in enumerate(own):
+            if count == self.k - 1 and not other[line]:
+                for cell in self.lines[line]:
+                    if not cells[cell] and cell not in moves:
+                        moves.append(cell)
+        return moves
+
+def mnk_minimax(board, depth, alpha, beta, player, deadline=None, first_move=None, stats=None):
+    # Mesmo contrato de minimax: [x, y, pontuação] do ponto de vista de COMP
+    if deadline is not None:
+        deadline.check()
+    if stats is not None:
+        stats.node(depth)
+
+    # A avaliação é mantida por make_move/unmake_move: nas folhas só é lida
+    if board.winner:
+        # Vitórias mais rápidas (com mais profundidade sobrando) valem mais
+        if stats is not None:
+            stats.evaluations += 1
+        return [-1, -1, board.winner * (WIN_SCORE + depth)]
+    if depth == 0 or board.is_full():
+        if stats is not None:
+            stats.evaluations += 1
+        return [-1, -1, board.score]
+
+    if stats is not None:
+        stats.expanded += 1
+        start = stats.clock()
+    moves = board.candidate_moves(player)
+    if stats is not None:
+        stats.generated(start)
+    if first_move is not None:
+        cell = first_move[0] * board.cols + first_move[1]
+        if cell in moves:
+            moves.remove(cell)
+            moves.insert(0, cell)
+
+    best = [-1, -1, -infinity if player == COMP else +infinity]
+    for cell in moves:
+        board.make_move(cell, player)
+        score = mnk_minimax(board, depth - 1, alpha, beta, -player, deadline, stats=stats)[2]
+        board.unmake_move()
+
+        if player == COMP:
+            if score > best[2]:
+                best = [cell // board.cols, cell % board.cols, score]
+                if stats is not None:
+                    stats.update_pv(depth, best[:2])
+            alpha = max(alpha, score)
+        else:
+            if score < best[2]:
+                best = [cell // board.cols, cell % board.cols, score]
+                if stats is not None:
+                    stats.update_pv(depth, best[:2])
+            beta = min(beta, score)
+        if beta <= alpha:
+            if stats is not None:
+                stats.cutoff(depth, cell == moves[0])
+            break
+
+    return best
+
+def mnk_search(board, time_budget_ms, player=COMP, stats=None, cancel=None):
+    # Como search, para um MNKBoard. Retorna ([x, y], pontuação, profundidade)
+    position = board.copy()
+
+    def search_depth(depth, best_move, deadline):
+        x, y, score = mnk_minimax(position, depth, -infinity, infinity, player, deadline, best_move, stats)
+        if stats is not None:
+            stats.complete_depth(depth, [x, y], score)
+        return [x, y], score
+
+    return iterative_deepening(search_depth, time_budget_ms, len(board.cells) - len(board.history), cancel)
@@ -0,0 +1,172 @@
+import os
+import sys
+from array import array
+
+from engine.tic_tac_toe import BOARD_SIZE, COMP
+
+# Tabela de jogo perfeito do jogo da velha. Cada tabuleiro é codificado em base 3
+# (casa i = x * BOARD_SIZE + y vale 3 ** i; dígito 0 vazia, 1 quem joga, 2 o
+# adversário), sempre do ponto de vista de quem joga, e reduzido às 8 simetrias
+# do tabuleiro: só o menor código entre as 8 transformações é guardado.
+CELLS = BOARD_SIZE * BOARD_SIZE
+POWERS = [3 ** i for i in range(CELLS)]
+
+LINES = [
+    [x * BOARD_SIZE + y for y in range(BOARD_SIZE)] for x in range(BOARD_SIZE)
+] + [
+    [x * BOARD_SIZE + y for x in range(BOARD_SIZE)] for y in range(BOARD_SIZE)
+] + [
+    [i * BOARD_SIZE + i for i in range(BOARD_SIZE)],
+    [(BOARD_SIZE - 1 - i) * BOARD_SIZE + i for i in range(BOARD_SIZE)],
+]
+
+def _symmetries():
+    # Para cada simetria, a casa de destino de cada casa i
+    last = BOARD_SIZE - 1
+    transforms = [
+        lambda x, y: (x, y),
+        lambda x, y: (y, last - x),
+        lambda x, y: (last - x, last - y),
+        lambda x, y: (last - y, x),
+        lambda x, y: (x, last - y),
+        lambda x, y: (last - x, y),
+        lambda x, y: (y, x),
+        lambda x, y: (last - y, last - x),
+    ]
+    permutations = []
+    for transform in transforms:
+        permutation = []
+        for i in range(CELLS):
+            x, y = transform(*divmod(i, BOARD_SIZE))
+            permutation.append(x * BOARD_SIZE + y)
+        permutations.append(permutation)
+    return permutations
+
+SYMMETRIES = _symmetries()
+# Inversas, para levar a jogada da forma canônica de volta ao tabuleiro real
+INVERSE_SYMMETRIES = [[permutation.index(i) for i in range(CELLS)] for permutation in SYMMETRIES]
+# Valor de cada casa em cada simetria: código transformado = soma de dígito * peso
+SYMMETRY_POWERS = [[POWERS[permutation[i]] for i in range(CELLS)] for permutation in SYMMETRIES]
+
+NO_MOVE = -1
+
+def encode(cells):
+    # cells: lista de CELLS dígitos (0 vazia, 1 quem joga, 2 adversário)
+    return sum(digit * power for digit, power in zip(cells, POWERS))
+
+def to_cells(state, player):
+    # Tabuleiro do jogo (listas de HUMAN/COMP/0) do ponto de vista de player
+    return [0 if cell == 0 else 1 if cell == player else 2 for row in state for cell in row]
+
+def canonical(cells):
+    # Retorna (menor código entre as 8 simetrias, índice da simetria usada)
+    best = None
+    for index, powers in enumerate(SYMMETRY_POWERS):
+        code = sum(digit * power for digit, power in zip(cells, powers))
+        if best is None or code < best[0]:
+            best = (code, index)
+    return best
+
+def _winner(cells):
+    for a, b, c in LINES:
+        if cells[a] and cells[a] == cells[b] == cells[c]:
+            return cells[a]
+    return 0
+
+def build_table():
+    # Negamax completo sobre todos os estados alcançáveis, começando por qualquer
+    # jogador. Retorna {código canônico: (pontuação, jogada canônica)}; a pontuação
+    # é de quem joga: positiva vence, negativa perde, 0 empate, e quanto maior o
+    # valor absoluto mais cedo o jogo acaba (vitórias rápidas, derrotas lentas)
+    table = {}
+
+    def solve(cells):
+        code, index = canonical(cells)
+        entry = table.get(code)
+        if entry is not None:
+            return entry[0]
+        empties = cells.count(0)
+        if _winner(cells):
+            # Só quem acabou de jogar pode ter vencido
+            entry = (-(empties + 1), NO_MOVE)
+        elif not empties:
+            entry = (0, NO_MOVE)
+        else:
+            best_score, best_move = None, NO_MOVE
+            for move in range(CELLS):
+                if cells[move]:
+                    continue
+                # Filho do ponto de vista do adversário: troca 1 <-> 2
+                child = [(3 - digit) % 3 for digit in cells]
+                child[move] = 2
+                score = -solve(child)
+                if best_score is None or score > best_score:
+                    best_score, best_move = score, move
+            entry = (best_score, SYMMETRIES[index][best_move])
+        table[code] = entry
+        return entry[0]
+
+    solve([0] * CELLS)
+    return table
+
+def save_table(table, path):
+    # Formato binário: quantidade (I), códigos ordenados (H) e pares pontuação/jogada (b)
+    codes = array('H', sorted(table))
+    entries = array('b')
+    for code in codes:
+        entries.extend(table[code])
+    with open(path, "wb") as f:
+        array('I', [len(codes)]).tofile(f)
+        codes.tofile(f)
+        entries.tofile(f)
+
+def load_table(path):
+    with open(path, "rb") as f:
+        count = array('I')
+        count.fromfile(f, 1)
+        codes = array('H')
+        codes.fromfile(f, count[0])
+        entries = array('b')
+        entries.fromfile(f, 2 * count[0])
+    return {code: (entries[2 * i], entries[2 * i + 1]) for i, code in enumerate(codes)}
+
+_table = None
+
+def get_table(path=None):
+    # Construída uma vez por processo; com path, lida do disco se existir ou
+    # gravada nele depois de construída
+    global _table
+    if _table is None:
+        if path is not None and os.path.exists(path):
+            _table = load_table(path)
+        else:
+            _table = build_table()
+            if path is not None:
+                save_table(_table, path)
+    return _table
+
+def perfect_move(state, player=COMP, table=None):
+    # Jogada ótima em O(1): ([x, y], valor) com valor +1 vitória, 0 empate e
+    # -1 derrota para player. A jogada é None se o jogo já acabou
+    if table is None:
+        table = get_table()
+    code, index = canonical(to_cells(state, player))
+    score, move = table[code]
+    value = (score > 0) - (score < 0)
+    if move == NO_MOVE:
+        return None, value
+    return list(divmod(INVERSE_SYMMETRIES[index][move], BOARD_SIZE)), value
+
+def main(argv=None):
+    # python -m engine.tic_tac_toe_table ARQUIVO: constrói e grava a tabela
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("uso: python -m engine.tic_tac_toe_table ARQUIVO")
+        return 2
+    table = build_table()
+    save_table(table, argv[0])
+    print(f"{len(table)} estados canônicos gravados em {argv[0]}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
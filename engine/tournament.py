@@ -0,0 +1,323 @@
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from math import inf
+
+from engine import checkers, connect_four, tic_tac_toe
+from engine.opening_book import OpeningBook
+from engine.selfplay import EnginePlayer, play_game, random_openings
+from engine.tablebase import DARK_SQUARES, Tablebase
+from engine.tic_tac_toe_table import get_table, perfect_move
+from engine.transposition import TranspositionTable
+
+# Torneio sem interface gráfica entre variantes do motor de um dos três jogos.
+# Cada par de variantes joga cada abertura sorteada duas vezes, trocando as
+# cores; as partidas rodam num ProcessPoolExecutor e são gravadas no log, num
+# formato parecido com PGN, à medida que terminam.
+#
+# Variante: NOME:opção=valor,... com as opções
+#   depth=N       profundidade fixa
+#   time=MS       aprofundamento iterativo com esse tempo por lance
+#   quiescence=N  limite de nós da quiescência (damas, só com depth; 0 desliga)
+#   tablebase=ARQ tabela de finais (damas, engine.tablebase)
+#   book=ARQ      livro de aberturas (Connect Four, engine.opening_book)
+#   perfect=1     tabela de jogo perfeito (jogo da velha)
+GAMES = ("checkers", "connect_four", "tic_tac_toe")
+OPTIONS = {"depth": int, "time": int, "quiescence": int, "tablebase": str, "book": str, "perfect": int}
+DEFAULT_DEPTHS = {"checkers": 6, "connect_four": 6, "tic_tac_toe": 9}
+DEFAULT_OPENING_PLIES = {"checkers": 4, "connect_four": 2, "tic_tac_toe": 1}
+DEFAULT_MAX_PLIES = {"checkers": 150, "connect_four": 42, "tic_tac_toe": 9}
+
+RESULTS = {0: "1-0", 1: "0-1", None: "1/2-1/2"}
+
+# Número de cada casa escura na notação das damas (1 a 18, como no PDN)
+SQUARE_NUMBERS = {sq: i + 1 for i, sq in enumerate(DARK_SQUARES)}
+
+def parse_variant(text):
+    name, _, spec = text.partition(":")
+    if not name:
+        raise ValueError(f"Variante sem nome: {text!r}")
+    options = {}
+    for item in filter(None, spec.split(",")):
+        key, _, value = item.partition("=")
+        if key not in OPTIONS:
+            raise ValueError(f"Opção desconhecida na variante {name}: {key!r}")
+        options[key] = OPTIONS[key](value)
+    return name, options
+
+# Tabelas de finais e livros abertos uma vez por processo
+_files = {}
+
+def _open(cls, path):
+    if path not in _files:
+        _files[path] = cls(path)
+    return _files[path]
+
+class ConnectFourPlayer:
+    def __init__(self, options):
+        self.depth = options.get("depth", DEFAULT_DEPTHS["connect_four"])
+        self.time_budget_ms = options.get("time")
+        self.book = _open(OpeningBook, options["book"]) if "book" in options else None
+        self.table = TranspositionTable()
+        self.moves = 0
+        self.seconds = 0.0
+
+    def choose(self, board):
+        # board vem de from_moves, então quem joga é sempre AI_PIECE
+        start = time.perf_counter()
+        if self.time_budget_ms is not None:
+            col, _, _ = connect_four.search(board, self.time_budget_ms, self.table, self.book)
+        else:
+            entry = self.book.probe(board) if self.book is not None else None
+            if entry is not None:
+                col = entry[0]
+            else:
+                self.table.new_search()
+                col, _ = connect_four.pvs(board, self.depth, -inf, inf, True, self.table)
+        self.seconds += time.perf_counter() - start
+        self.moves += 1
+        return col
+
+class TicTacToePlayer:
+    def __init__(self, options):
+        self.depth = options.get("depth", DEFAULT_DEPTHS["tic_tac_toe"])
+        self.time_budget_ms = options.get("time")
+        self.perfect = bool(options.get("perfect"))
+        if self.perfect:
+            # Constrói a tabela antes da primeira jogada, fora da medição de tempo
+            get_table()
+        self.moves = 0
+        self.seconds = 0.0
+
+    def choose(self, state, player):
+        start = time.perf_counter()
+        if self.perfect:
+            move, _ = perfect_move(state, player)
+        elif self.time_budget_ms is not None:
+            move, _, _ = tic_tac_toe.search(state, self.time_budget_ms, player)
+        else:
+            # Sem passar do número de casas vazias (ver tic_tac_toe.search)
+            depth = min(self.depth, len(tic_tac_toe.empty_cells(state)))
+            x, y, _ = tic_tac_toe.minimax(state, depth, -inf, inf, player)
+            move = [x, y]
+        self.seconds += time.perf_counter() - start
+        self.moves += 1
+        return move
+
+def _checkers_player(options):
+    tablebase = _open(Tablebase, options["tablebase"]) if "tablebase" in options else None
+    return EnginePlayer(options.get("depth", DEFAULT_DEPTHS["checkers"]),
+                        options.get("quiescence", checkers.QUIESCENCE_NODES), tablebase, options.get("time"))
+
+def _play_checkers(opening, white, black, max_plies):
+    text, side = opening
+    winner, moves = play_game(text, side, white, black, max_plies)
+    notation = [f"{SQUARE_NUMBERS[frm]}{'x' if captured else '-'}{SQUARE_NUMBERS[to]}" for frm, to, captured in moves]
+    return {checkers.WHITE: 0, checkers.BLACK: 1, None: None}[winner], notation
+
+def _play_connect_four(opening, white, black, max_plies):
+    # As jogadas são guardadas como a string de colunas de from_moves, que
+    # reconstrói o tabuleiro do ponto de vista de quem joga a seguir
+    moves = opening
+    notation = []
+    players = (white, black)
+    for _ in range(max_plies):
+        board = connect_four.from_moves(moves)
+        if connect_four.is_terminal_node(board):
+            break
+        col = players[len(moves) % 2].choose(board)
+        moves += str(col + 1)
+        notation.append(str(col + 1))
+    # Em from_moves quem acabou de jogar tem PLAYER_PIECE
+    if connect_four.winning_move(connect_four.from_moves(moves), connect_four.PLAYER_PIECE):
+        return (len(moves) - 1) % 2, notation
+    return None, notation
+
+def _play_tic_tac_toe(opening, white, black, max_plies):
+    # As brancas são COMP e jogam primeiro
+    state = tic_tac_toe.create_board()
+    player = tic_tac_toe.COMP
+    for x, y in opening:
+        state[x][y] = player
+        player = -player
+    notation = []
+    players = {tic_tac_toe.COMP: white, tic_tac_toe.HUMAN: black}
+    for _ in range(max_plies):
+        if tic_tac_toe.game_over(state) or not tic_tac_toe.empty_cells(state):
+            break
+        x, y = players[player].choose(state, player)
+        state[x][y] = player
+        notation.append(f"{'abc'[y]}{x + 1}")
+        player = -player
+    if tic_tac_toe.wins(state, tic_tac_toe.COMP):
+        return 0, notation
+    if tic_tac_toe.wins(state, tic_tac_toe.HUMAN):
+        return 1, notation
+    return None, notation
+
+PLAYERS = {"checkers": _checkers_player, "connect_four": ConnectFourPlayer, "tic_tac_toe": TicTacToePlayer}
+PLAY = {"checkers": _play_checkers, "connect_four": _play_connect_four, "tic_tac_toe": _play_tic_tac_toe}
+
+def run_game(game, white_options, black_options, opening, max_plies):
+    # Uma partida com jogadores novos (tabelas vazias), para que as partidas
+    # sejam independentes e possam rodar em qualquer processo.
+    # Retorna (vencedor: 0 brancas, 1 pretas, None empate, lances, segundos e
+    # número de lances de cada lado)
+    white, black = PLAYERS[game](white_options), PLAYERS[game](black_options)
+    winner, notation = PLAY[game](opening, white, black, max_plies)
+    return winner, notation, (white.seconds, black.seconds), (white.moves, black.moves)
+
+def openings_for(game, count, plies, seed=0):
+    if game == "checkers":
+        return random_openings(count, plies, seed)
+    rng = random.Random(seed)
+    openings = []
+    for _ in range(count * 100):
+        if len(openings) == count:
+            break
+        if game == "connect_four":
+            opening = ""
+            for _ in range(plies):
+                board = connect_four.from_moves(opening)
+                if connect_four.is_terminal_node(board):
+                    break
+                opening += str(rng.choice(connect_four.get_valid_locations(board)) + 1)
+            over = connect_four.is_terminal_node(connect_four.from_moves(opening))
+        else:
+            cells = rng.sample(tic_tac_toe.empty_cells(tic_tac_toe.create_board()), plies)
+            opening = [tuple(cell) for cell in cells]
+            over = False
+        if opening not in openings and not over:
+            openings.append(opening)
+    return openings
+
+def opening_text(game, opening):
+    if game == "checkers":
+        text, side = opening
+        return f"{text} {'w' if side == checkers.WHITE else 'b'}"
+    if game == "connect_four":
+        return opening or "-"
+    return " ".join(f"{'abc'[y]}{x + 1}" for x, y in opening) or "-"
+
+def format_game(game, number, white, black, opening, winner, notation, first_mover):
+    # Entrada do log: etiquetas e lances numerados como no PGN
+    lines = [
+        f'[Game "{game}"]', f'[Round "{number}"]', f'[White "{white}"]', f'[Black "{black}"]',
+        f'[Opening "{opening}"]', f'[Result "{RESULTS[winner]}"]', "",
+    ]
+    text = []
+    for i, move in enumerate(notation):
+        ply = i + first_mover
+        if ply % 2 == 0:
+            text.append(f"{ply // 2 + 1}.")
+        elif i == 0:
+            text.append(f"{ply // 2 + 1}...")
+        text.append(move)
+    text.append(RESULTS[winner])
+    lines.append(" ".join(text))
+    return "\n".join(lines) + "\n\n"
+
+def first_mover(game, opening):
+    # 0 se as brancas (quem começa o jogo) jogam depois da abertura, 1 se as pretas
+    if game == "checkers":
+        return 0 if opening[1] == checkers.WHITE else 1
+    return len(opening) % 2
+
+def elo_difference(score):
+    if score <= 0:
+        return -inf
+    if score >= 1:
+        return inf
+    return -400 * math.log10(1 / score - 1)
+
+def elo_interval(wins, draws, losses, z=1.96):
+    # Diferença de Elo e intervalo de confiança (aproximação normal da média
+    # dos pontos por partida, convertida em Elo nas duas pontas)
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = z * math.sqrt(variance / games)
+    return elo_difference(score), elo_difference(score - margin), elo_difference(score + margin)
+
+def run_tournament(game, variants, openings, max_plies, workers=None, log=None):
+    # variants: [(nome, opções)]. Retorna {(a, b): [vitórias, empates, derrotas] de a}
+    # e {nome: [segundos, lances]}
+    pairs = {(a, b): [0, 0, 0] for (a, _), (b, _) in combinations(variants, 2)}
+    timing = {name: [0.0, 0] for name, _ in variants}
+    with ProcessPoolExecutor(workers) as executor:
+        futures = {}
+        for (a, a_options), (b, b_options) in combinations(variants, 2):
+            for opening in openings:
+                for white, black in (((a, a_options), (b, b_options)), ((b, b_options), (a, a_options))):
+                    future = executor.submit(run_game, game, white[1], black[1], opening, max_plies)
+                    futures[future] = (len(futures) + 1, a, b, white[0], black[0], opening)
+        for future in as_completed(futures):
+            number, a, b, white, black, opening = futures[future]
+            winner, notation, seconds, moves = future.result()
+            result = pairs[a, b]
+            if winner is None:
+                result[1] += 1
+            elif (white, black)[winner] == a:
+                result[0] += 1
+            else:
+                result[2] += 1
+            for name, side_seconds, side_moves in zip((white, black), seconds, moves):
+                timing[name][0] += side_seconds
+                timing[name][1] += side_moves
+            if log is not None:
+                log.write(format_game(game, number, white, black, opening_text(game, opening), winner, notation,
+                                      first_mover(game, opening)))
+                log.flush()
+    return pairs, timing
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Torneio entre variantes do motor, com partidas em paralelo.")
+    parser.add_argument("--game", choices=GAMES, default="checkers")
+    parser.add_argument("--variant", action="append", default=[], metavar="NOME:opção=valor,...",
+                        help="variante do motor (pelo menos duas); opções: " + ", ".join(OPTIONS))
+    parser.add_argument("--openings", type=int, default=10, help="aberturas sorteadas (cada uma jogada com as duas cores)")
+    parser.add_argument("--opening-plies", type=int, help="lances aleatórios de cada abertura")
+    parser.add_argument("--max-plies", type=int, help="lances até declarar empate")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos")
+    parser.add_argument("--log", help="arquivo onde gravar as partidas")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    try:
+        variants = [parse_variant(text) for text in args.variant]
+    except ValueError as error:
+        parser.error(str(error))
+    if len(variants) < 2 or len({name for name, _ in variants}) != len(variants):
+        parser.error("são necessárias pelo menos duas variantes com nomes diferentes")
+    plies = args.opening_plies if args.opening_plies is not None else DEFAULT_OPENING_PLIES[args.game]
+    max_plies = args.max_plies or DEFAULT_MAX_PLIES[args.game]
+    openings = openings_for(args.game, args.openings, plies, args.seed)
+
+    start = time.perf_counter()
+    log = open(args.log, "w") if args.log else None
+    try:
+        pairs, timing = run_tournament(args.game, variants, openings, max_plies, args.workers, log)
+    finally:
+        if log is not None:
+            log.close()
+
+    games = sum(sum(result) for result in pairs.values())
+    print(f"{args.game}: {games} partidas, {len(openings)} aberturas, {args.workers} processos, "
+          f"{time.perf_counter() - start:.1f}s")
+    width = max(len(name) for name, _ in variants)
+    for (a, b), (wins, draws, losses) in pairs.items():
+        elo, low, high = elo_interval(wins, draws, losses)
+        score = (wins + draws / 2) / (wins + draws + losses)
+        print(f"{a:>{width}} contra {b:<{width}}  {wins} V / {draws} E / {losses} D  ({score:.1%})  "
+              f"Elo {elo:+.0f} [{low:+.0f}, {high:+.0f}]")
+    for name, (seconds, moves) in timing.items():
+        print(f"{name:>{width}}: {1000 * seconds / max(moves, 1):.1f} ms por lance")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
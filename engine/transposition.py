@@ -0,0 +1,51 @@
+# Tipos de limite guardados na tabela de transposição
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+class TranspositionTable:
+    # Tabela de tamanho fixo indexada pelos bits baixos de um hash de Zobrist; cada
+    # entrada é (chave, profundidade, limite, pontuação, melhor jogada, geração)
+    def __init__(self, size=1 << 18):
+        if size & (size - 1):
+            raise ValueError("O tamanho da tabela deve ser uma potência de 2")
+        self.size = size
+        self.mask = size - 1
+        self.entries = [None] * size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def new_search(self):
+        # Entradas de buscas anteriores passam a ser substituídas primeiro
+        self.generation += 1
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.hits = self.misses = self.collisions = 0
+
+    def probe(self, key):
+        entry = self.entries[key & self.mask]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != key:
+            # Posição diferente ocupando o mesmo índice
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, flag, score, move):
+        index = key & self.mask
+        entry = self.entries[index]
+        # Substituição: preferir a entrada mais profunda, exceto se for de uma busca antiga
+        if entry is None or entry[0] == key or entry[5] != self.generation or depth >= entry[1]:
+            self.entries[index] = (key, depth, flag, score, move, self.generation)
+
+    def usage(self):
+        return sum(1 for entry in self.entries if entry is not None) / self.size
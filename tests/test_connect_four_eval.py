@@ -0,0 +1,50 @@
+import random
+
+from engine.connect_four import (
+    AI_PIECE, COLUMN_COUNT, EMPTY, PLAYER_PIECE, ROW_COUNT, WINDOW_LENGTH, create_board, evaluate_window,
+    score_position,
+)
+
+# Diferencial da avaliação incremental: Position.score, mantido por make_move e
+# unmake_move a partir de WINDOW_DELTAS e CENTER_SCORES, deve ser sempre igual
+# a score_position (bitboards) e à pontuação janela a janela de evaluate_window
+GAMES = 50
+
+def reference_score(board, piece):
+    # Pontuação do jeito original: matriz de casas, centro e cada janela de 4
+    grid = [[board.get_piece(r, c) for c in range(COLUMN_COUNT)] for r in range(ROW_COUNT)]
+    score = [grid[r][COLUMN_COUNT // 2] for r in range(ROW_COUNT)].count(piece) * 3
+    for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+        for r in range(ROW_COUNT):
+            for c in range(COLUMN_COUNT):
+                end_r, end_c = r + (WINDOW_LENGTH - 1) * dr, c + (WINDOW_LENGTH - 1) * dc
+                if 0 <= end_r < ROW_COUNT and end_c < COLUMN_COUNT:
+                    window = [grid[r + i * dr][c + i * dc] for i in range(WINDOW_LENGTH)]
+                    score += evaluate_window(window, piece)
+    return score
+
+def check(board):
+    assert board.score == score_position(board, AI_PIECE)
+    assert board.score == reference_score(board, AI_PIECE)
+
+def test_incremental_score_matches_reference():
+    rng = random.Random(20240601)
+    for _ in range(GAMES):
+        board = create_board()
+        played = []
+        check(board)
+        while board.moves < ROW_COUNT * COLUMN_COUNT:
+            # Volta algumas jogadas de vez em quando, como a busca faz
+            if played and rng.random() < 0.3:
+                for _ in range(min(rng.randint(1, 3), len(played))):
+                    board.unmake_move(played.pop())
+                    check(board)
+                continue
+            col = rng.choice([c for c in range(COLUMN_COUNT) if board.can_play(c)])
+            board.make_move(col, AI_PIECE if board.moves % 2 else PLAYER_PIECE)
+            played.append(col)
+            check(board)
+        while played:
+            board.unmake_move(played.pop())
+            check(board)
+        assert board.score == 0 and board.bitboards == [EMPTY, 0, 0]